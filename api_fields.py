@@ -0,0 +1,63 @@
+"""YouTube API 응답 필드 마스크 (fields 파라미터) — 파이프라인이 실제로 읽는 필드만.
+
+설명/태그/localized 등은 받지도 파싱하지도 않는다. 새 필드를 읽으려면 여기부터 고친다.
+- search: videoId / channelId만 (나머지는 videos().list에서 받음)
+- videos / chart: scoring._VIDEO_FIELDS + 썸네일 URL (entity_store도 같은 필드만 사용)
+- channels: 구독자 / 영상 수 / 총 조회수
+- statistics: 스냅샷 / 채널 기준선 재조회용 카운터
+- playlistItems: 업로드 재생목록의 영상 ID / 게시 시각
+"""
+_THUMBNAILS = "thumbnails(default/url,medium/url,high/url,standard/url,maxres/url)"
+_VIDEO_ITEM = (
+    f"id,snippet(title,channelTitle,channelId,publishedAt,categoryId,{_THUMBNAILS}),"
+    "statistics(viewCount,likeCount,commentCount),contentDetails/duration"
+)
+
+FIELDS = {
+    "search": "nextPageToken,items(id/videoId,snippet/channelId)",
+    "videos": f"items({_VIDEO_ITEM})",
+    "chart": f"nextPageToken,items({_VIDEO_ITEM})",
+    "channels": "items(id,statistics(subscriberCount,videoCount,viewCount))",
+    "statistics": "items(id,statistics(viewCount,likeCount,commentCount))",
+    "playlistItems": "items/contentDetails(videoId,videoPublishedAt)",
+}
+
+
+def parse_fields(expr: str) -> dict:
+    """fields 식 → {이름: 하위 트리 또는 None(전체)}. 예) "a,b(c,d/e)" """
+    tree, _ = _parse(expr, 0)
+    return tree
+
+
+def _parse(expr, i):
+    tree = {}
+    while i < len(expr):
+        j = i
+        while j < len(expr) and expr[j] not in ",()":
+            j += 1
+        *parents, leaf = expr[i:j].strip().split("/")
+        node = tree
+        for name in parents:
+            node = node.setdefault(name, {})
+        if j < len(expr) and expr[j] == "(":
+            sub, j = _parse(expr, j + 1)
+            node.setdefault(leaf, {}).update(sub)
+            j += 1  # ')'
+        else:
+            node[leaf] = None
+        if j < len(expr) and expr[j] == ")":
+            return tree, j
+        i = j + 1  # ','
+    return tree, i
+
+
+def project(obj, fields):
+    """응답에 fields 마스크를 적용 (오프라인 대역이 실제 API처럼 잘라 주도록)."""
+    tree = parse_fields(fields) if isinstance(fields, str) else fields
+    if tree is None:
+        return obj
+    if isinstance(obj, list):
+        return [project(x, tree) for x in obj]
+    if not isinstance(obj, dict):
+        return obj
+    return {k: project(obj[k], sub) for k, sub in tree.items() if k in obj}
@@ -1,28 +1,35 @@
 import streamlit as st
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
-import isodate
+import time
+from datetime import datetime
 import pandas as pd
+import pyarrow.dataset as ds
+
+from archive import ResultArchive, export_query, export_result
+from channel_baseline import ChannelBaselines
+from entity_store import EntityStore
+from key_pool import get_pool, parse_keys
+from local_index import LocalIndex
+from pipeline import (
+    CATEGORY_MAP,
+    regions_for,
+    run_compare,
+    run_local_search,
+    run_search,
+    run_trending,
+)
+from result_store import ResultStore, result_key
+from scoring import format_display
+from search_trace import SearchTrace
+from snapshots import SnapshotCollector, SnapshotStore
+from transcripts import PREFETCH_TOP_N, TranscriptService, to_text
+from yt_cache import ResponseCache
+from yt_client import client_stats, get_client
 
 # ==========================================
 # 🔐 API 키는 Streamlit Cloud의 'Secrets'에서 가져옵니다.
 # ==========================================
 st.set_page_config(page_title="SIGNAL - Insight", layout="wide", page_icon="📡")
 
-# -------------------------------------------------------------------------
-# ⭐ [데이터 정의]
-# -------------------------------------------------------------------------
-CATEGORY_MAP = {
-    "전체": None, "영화/애니": "1", "자동차": "2", "음악": "10",
-    "동물": "15", "스포츠": "17", "여행/이벤트": "19", "게임": "20",
-    "브이로그/인물": "22", "코미디": "23", "엔터테인먼트": "24",
-    "뉴스/정치": "25", "하우투/스타일": "26", "교육": "27", "과학/기술": "28"
-}
-region_map = {"🔵한국": "KR", "🔴일본": "JP", "🟢미국": "US", "🌏전체": None}
-
-# 카테고리 ID → 한글 이름 매핑
-CATEGORY_NAME_BY_ID = {v: k for k, v in CATEGORY_MAP.items() if v is not None}
-
 # -------------------------------------------------------------------------
 # 🌑 [스타일링]
 # -------------------------------------------------------------------------
@@ -188,19 +195,125 @@ st.markdown("""
 
 st.title("📡 SIGNAL : Insight")
 
+# 수집 중 부분 결과를 그리는 자리 (검색이 끝나면 비운다)
+live_results = st.empty()
+
 # -------------------------------------------------------------------------
 # 함수 정의
 # -------------------------------------------------------------------------
-def parse_duration(d: str) -> str:
-    """ISO 8601 duration 문자열을 mm:ss 또는 hh:mm:ss로 변환."""
-    try:
-        dur = isodate.parse_duration(d)
-        sec = int(dur.total_seconds())
-        m, s = divmod(sec, 60)
-        h, m = divmod(m, 60)
-        return f"{h}:{m:02}:{s:02}" if h else f"{m}:{s:02}"
-    except Exception:
-        return d
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """프로세스 전역 API 응답 캐시 (Streamlit 재시작 후에도 디스크에 유지)."""
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_entity_store() -> EntityStore:
+    """프로세스 전역 채널/영상 저장소 (검색 간 겹치는 엔티티는 델타만 조회)."""
+    return EntityStore()
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    """프로세스 전역 조회수 스냅샷 저장소."""
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_snapshot_collector() -> SnapshotCollector:
+    """추적 영상 조회수를 주기적으로 다시 찍는 백그라운드 수집기 (스냅샷 저장소당 1개).
+
+    키는 검색할 때 use()로 넘긴다 (키마다 수집기를 따로 띄우면 같은 영상을 중복 재조회).
+    """
+    return SnapshotCollector(None, get_snapshot_store()).start()
+
+
+@st.cache_resource
+def get_channel_baselines() -> ChannelBaselines:
+    """프로세스 전역 채널 기준선 저장소 (채널별 최근 업로드 조회수, 증분 동기화)."""
+    return ChannelBaselines()
+
+
+@st.cache_resource
+def get_result_archive() -> ResultArchive:
+    """검색 결과 누적 Parquet 아카이브 (날짜/키워드 파티션, append-only)."""
+    return ResultArchive()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_archive_keywords() -> list:
+    """아카이브 키워드 목록 (검색 결과를 덧붙이면 바로 비운다)."""
+    return get_result_archive().keywords()
+
+
+def export_archive(keyword, since, until, min_perf):
+    """아카이브 조회 결과 Parquet 스트림 (download_button이 클릭 시에만 호출)."""
+    scanner = get_result_archive().scanner(
+        keyword=keyword, since=since, until=until,
+        where=ds.field("raw_perf") >= min_perf if min_perf else None,
+    )
+    return export_query(scanner) if scanner is not None else b""
+
+
+@st.cache_resource
+def get_result_store() -> ResultStore:
+    """프로세스 전역 검색 결과 저장소 (같은 조건 검색은 세션 간 프레임 하나를 공유)."""
+    return ResultStore()
+
+
+@st.cache_resource
+def get_local_index() -> LocalIndex:
+    """누적 검색 결과 로컬 전문 검색 인덱스 (쿼터 0 검색용)."""
+    return LocalIndex()
+
+
+@st.cache_resource
+def get_transcript_service() -> TranscriptService:
+    """프로세스 전역 자막 서비스 (압축 디스크 캐시 + 백그라운드 다운로드)."""
+    return TranscriptService(on_ready=get_local_index().add_transcript)
+
+
+def show_transcript(video_id: str, status: str, lang: str, payload):
+    if status == "ready":
+        with st.expander(f"📝 자막 ({lang})", expanded=False):
+            with st.container(height=260):
+                st.text(to_text(payload))
+    elif status == "none":
+        st.caption("📝 자막 없음")
+    elif status == "error":
+        st.caption(f"📝 자막을 불러오지 못했습니다: {payload}")
+        # 실패한 자막은 재실행마다 다시 받지 않고, 버튼을 누르거나 잠시 뒤에만 다시 시도
+        st.button(
+            "🔁 자막 다시 시도",
+            key=f"transcript_retry_{video_id}",
+            on_click=get_transcript_service().request,
+            args=(video_id,),
+            kwargs={"retry": True},
+        )
+    else:
+        st.caption("📝 자막 불러오는 중...")
+
+
+def render_transcript(video_id: str):
+    """자막 표시. 다운로드는 백그라운드에서만 하고 여기서는 절대 기다리지 않는다."""
+    svc = get_transcript_service()
+    svc.request(video_id)
+    status, lang, payload = svc.get(video_id)
+    if status in ("pending", "missing"):
+        transcript_pending(video_id)
+    else:
+        show_transcript(video_id, status, lang, payload)
+
+
+@st.fragment(run_every=2)
+def transcript_pending(video_id: str):
+    """다운로드가 끝날 때까지 이 조각만 2초마다 다시 그린다.
+
+    끝나면 결과도 이 조각 안에서 그린다 (앱 전체 재실행 없이). 조각 본문에서는 타이머를
+    멈추거나 미리보기 조각을 다시 실행할 수 없어, 타이머는 다른 행을 골라 미리보기 조각이
+    다시 실행될 때 이 조각과 함께 정리된다. 여기서는 다운로드를 다시 요청하지 않는다.
+    """
+    show_transcript(video_id, *get_transcript_service().get(video_id))
 
 # -------------------------------------------------------------------------
 # 상태 초기화
@@ -209,8 +322,242 @@ if "df_result" not in st.session_state:
     st.session_state.df_result = None
 if "selected_index" not in st.session_state:
     st.session_state.selected_index = 0
+if "keyword_stats" not in st.session_state:
+    st.session_state.keyword_stats = None
+if "max_perf" not in st.session_state:
+    st.session_state.max_perf = 1000
+    st.session_state.result_version = 0
+if "search_trace" not in st.session_state:
+    st.session_state.search_trace = None
+    st.session_state.trace_pending = False
+
+# 키 여러 개는 YOUTUBE_API_KEYS (리스트 또는 콤마 구분) — 쿼터를 나눠 쓰는 키 풀로 묶는다
+api_key = ",".join(
+    parse_keys(st.secrets.get("YOUTUBE_API_KEYS", None))
+    or parse_keys(st.secrets.get("YOUTUBE_API_KEY", None))
+) or None
+if api_key:
+    # 첫 검색 전에 미리 build 해둔다 (이후 검색은 재사용)
+    for key in parse_keys(api_key):
+        get_client(key)
+
+# 결과 테이블에 보내는 컬럼 (순서 그대로 표시)
+TABLE_COLUMNS = [
+    "No",
+    "키워드",
+    "썸네일",
+    "채널명",
+    "제목",
+    "카테고리",
+    "게시일",
+    "총 영상 수",
+    "조회수",
+    "좋아요",
+    "성과도",
+    "채널 대비",
+    "등급",
+    "길이",
+    "일일 속도",
+    "1시간 조회",
+    "24시간 조회",
+    "이동",
+]
+PAGE_SIZES = [50, 100, 200, 500]
+
+
+def result_column_config(max_perf: float) -> dict:
+    """결과 테이블 컬럼 설정 (최종 테이블 / 수집 중 부분 결과 공통)."""
+    return {
+        "No": st.column_config.TextColumn("No", width=40),
+        "키워드": st.column_config.TextColumn("키워드", width=100),
+        "썸네일": st.column_config.ImageColumn("썸네일", width=80),
+        "채널명": st.column_config.TextColumn("채널명", width=140),
+        "제목": st.column_config.TextColumn("제목", width=320),
+        "카테고리": st.column_config.TextColumn("카테고리", width=90),
+        "게시일": st.column_config.TextColumn("게시일", width=90),
+        "총 영상 수": st.column_config.TextColumn("총 영상 수", width=90),
+        "조회수": st.column_config.TextColumn("조회수", width=100),
+        "좋아요": st.column_config.TextColumn("좋아요", width=90),
+        "성과도": st.column_config.ProgressColumn(
+            "성과도",
+            format="%.0f%%",
+            min_value=0,
+            max_value=max_perf,
+            width=110,
+        ),
+        "채널 대비": st.column_config.NumberColumn(
+            "채널 대비", format="%.0f%%", width=90,
+            help="채널 최근 업로드 중앙 조회수 대비",
+        ),
+        "등급": st.column_config.TextColumn("등급", width=90),
+        "길이": st.column_config.TextColumn("길이", width=70),
+        "일일 속도": st.column_config.TextColumn("일일 속도", width=110),
+        "1시간 조회": st.column_config.TextColumn("1시간 조회", width=90),
+        "24시간 조회": st.column_config.TextColumn("24시간 조회", width=100),
+        "이동": st.column_config.LinkColumn(
+            "이동", display_text="▶", width=50
+        ),
+    }
+
+
+def table_view(rows: pd.DataFrame) -> pd.DataFrame:
+    """압축 결과의 일부 행 → 테이블에 보낼 표시 컬럼만 (숨김 컬럼 ID, raw_*는 제외)."""
+    view = format_display(rows)
+    return view[[c for c in TABLE_COLUMNS if c in view.columns]]
+
+# -------------------------------------------------------------------------
+# 결과 조각 (행 선택/재선택 시 스크립트 전체 대신 이 부분만 재실행)
+# -------------------------------------------------------------------------
+@st.fragment(key="preview")
+def render_preview():
+    """선택된 영상 미리보기. 행 선택 시 앱 전체가 아니라 이 조각만 다시 실행된다."""
+    df = st.session_state.df_result
+    selected_row = None
+
+    if df is not None and not df.empty:
+        idx = st.session_state.get("selected_index", 0)
+        if idx is None or idx >= len(df):
+            idx = 0
+            st.session_state.selected_index = 0
+        selected_row = format_display(df.iloc[[idx]]).iloc[0]
+
+    if selected_row is None:
+        st.info("테이블에서 영상을 선택하거나 검색을 실행하면 여기 미리보기가 표시됩니다.")
+    else:
+        st.markdown(
+            f"""
+            <h2 style="
+                margin: 4px 0 12px 0;
+                color: #7DF9FF;
+                line-height: 1.4;
+                font-weight: 700;
+                text-align: center;
+                text-shadow:
+                    0 0 6px rgba(56, 189, 248, 0.9),
+                    0 0 14px rgba(56, 189, 248, 0.8),
+                    0 0 24px rgba(56, 189, 248, 0.7);
+            ">
+                {selected_row['제목']}
+            </h2>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        channel_name = selected_row["채널명"]
+        total_videos = selected_row["총 영상 수"]
+        published = selected_row["게시일"]
+        perf_str = f"{selected_row['raw_perf']:,.0f}%"
+        views_str = f"{selected_row['raw_view']:,}"
+        eng_str = f"{float(selected_row['raw_engagement']):.2f}%"
+        likes_str = f"{int(selected_row['raw_like']):,}"
+        url = selected_row["이동"]
+
+        summary_html = f"""
+        <div class="summary-bar">
+            <div class="summary-left">
+                <span>📺 <b>{channel_name}</b></span>
+                <span>· 총 {total_videos}</span>
+                <span>· 📅 {published}</span>
+            </div>
+            <div class="summary-right">
+                <span class="chip chip-hot">🔥 {perf_str}</span>
+                <span class="chip chip-view">👁 {views_str}</span>
+                <span class="chip chip-like">👍 {likes_str}</span>
+                <span class="chip chip-eng">💬 {eng_str}</span>
+                <a class="summary-link" href="{url}" target="_blank">유튜브에서 보기</a>
+            </div>
+        </div>
+        """
+        st.markdown(summary_html, unsafe_allow_html=True)
+
+        youtube_embed = f"https://www.youtube.com/embed/{selected_row['ID']}"
+        st.markdown(
+            f"""
+            <div class="video-wrapper">
+                <iframe
+                    src="{youtube_embed}"
+                    frameborder="0"
+                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
+                    allowfullscreen>
+                </iframe>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        render_transcript(selected_row["ID"])
+
+
+def on_row_select(table_key: str, offset: int):
+    """행 선택 콜백: 테이블은 그대로 두고 미리보기 조각만 다시 실행한다."""
+    rows = st.session_state[table_key].selection.rows
+    if rows:
+        st.session_state.selected_index = offset + rows[0]
+    st.rerun(scope="preview")
+
+
+@st.fragment(key="results")
+def render_results():
+    """결과 테이블. 현재 페이지 행만 브라우저로 보내고, 행 선택은 미리보기만 갱신."""
+    df = st.session_state.df_result
+
+    st.markdown("### 📊 전체 영상 리스트")
+
+    if df is None or df.empty:
+        st.info("검색 결과가 없습니다. 사이드바에서 검색을 실행해주세요.")
+    else:
+        # 페이지 이동/크기 변경은 이 조각만 다시 실행된다
+        version = st.session_state.result_version
+        p1, p2, p3 = st.columns([1, 1, 3])
+        with p1:
+            page_size = st.selectbox(
+                "페이지당", PAGE_SIZES, index=0, key=f"page_size_{version}"
+            )
+        n_pages = max(1, -(-len(df) // page_size))
+        with p2:
+            page = st.number_input(
+                "페이지", min_value=1, max_value=n_pages, value=1, step=1,
+                key=f"page_{version}",
+            )
+        offset = (page - 1) * page_size
+        rows = df.iloc[offset:offset + page_size]
+        with p3:
+            st.caption(
+                f"총 {len(df):,}개 중 {offset + 1:,}–{offset + len(rows):,} "
+                f"({page}/{n_pages} 페이지)"
+            )
+            # 클릭했을 때만 행 그룹 단위로 직렬화한다 (표시 문자열 없이 수치 컬럼 그대로)
+            st.download_button(
+                "⬇️ 전체 결과 Parquet",
+                data=lambda: export_result(df),
+                file_name=f"signal_{datetime.now():%Y%m%d_%H%M}.parquet",
+                mime="application/vnd.apache.parquet",
+                on_click="ignore",
+                key=f"export_{version}",
+            )
+
+        # 표시용 컬럼(좋아요 등)과 성과도 최대값은 검색할 때 한 번만 계산해 둔다
+        table_key = f"result_table_{version}_{page}_{page_size}"
+        trace = st.session_state.search_trace
+        render_started = time.perf_counter()
+        st.dataframe(
+            # 표시 문자열은 현재 페이지 행만 포맷한다
+            table_view(rows),
+            key=table_key,
+            height=min(1100, 35 * (len(rows) + 1) + 3),
+            use_container_width=True,
+            selection_mode="single-row",
+            on_select=lambda: on_row_select(table_key, offset),
+            hide_index=True,
+            column_config=result_column_config(st.session_state.max_perf),
+        )
+
+        # 검색 직후 첫 렌더링까지 포함해 트레이스를 마무리하고 JSONL로 남긴다
+        if trace is not None and st.session_state.trace_pending:
+            trace.phases["render"] = time.perf_counter() - render_started
+            trace.write_jsonl()
+            st.session_state.trace_pending = False
 
-api_key = st.secrets.get("YOUTUBE_API_KEY", None)
 
 # -------------------------------------------------------------------------
 # ▶ 사이드바 (PREVIEW + 검색폼)
@@ -223,7 +570,7 @@ with st.sidebar:
 
     with st.form(key="search_form"):
         if not api_key:
-            api_key = st.text_input("API 키 입력", type="password")
+            api_key = st.text_input("API 키 입력 (여러 개는 콤마 구분)", type="password")
 
         # 1행: 키워드 + 버튼
         c1, c2 = st.columns([4, 1])
@@ -232,12 +579,31 @@ with st.sidebar:
         with c2:
             search_trigger = st.form_submit_button("🚀", use_container_width=True, type="primary")
 
-        # 2행: 수집 / 기간
-        c3, c4 = st.columns(2)
+        # 2행: 수집 / 기간 / 카테고리 (카테고리는 검색 API에서 바로 거름)
+        c3, c4, c8 = st.columns(3)
         with c3:
             max_results = st.selectbox("수집", [10, 30, 50, 100], index=1)
         with c4:
             days_filter = st.selectbox("기간", ["1주일", "1개월", "3개월", "전체"], index=1)
+        with c8:
+            category = CATEGORY_MAP[st.selectbox("카테고리", list(CATEGORY_MAP), index=0)]
+
+        # 3행: 딥 수집 (nextPageToken 페이지네이션)
+        c5, c6, c7 = st.columns([1, 1, 1])
+        with c5:
+            deep_mode = st.toggle("🔎 딥 수집", value=False)
+            prefetch_transcripts = st.toggle(
+                f"📝 자막 미리 받기 (상위 {PREFETCH_TOP_N})", value=False
+            )
+            local_mode = st.toggle("💾 로컬 검색 (쿼터 0)", value=False)
+            compare_mode = st.toggle("🆚 키워드 비교 (콤마 구분)", value=False)
+            trending_mode = st.toggle("🔥 트렌딩 차트 (키워드 없이)", value=False)
+        with c6:
+            deep_target = st.selectbox("딥 목표", [500, 1000, 2000, 5000], index=0)
+        with c7:
+            quota_budget = st.number_input(
+                "쿼터 예산", min_value=100, max_value=10_000, value=2_000, step=100
+            )
 
         st.caption("국가")
         country_options = st.pills(
@@ -257,6 +623,14 @@ with st.sidebar:
             label_visibility="collapsed",
         )
 
+        st.caption("등급 기준")
+        grade_basis = st.segmented_control(
+            "등급 기준",
+            ["구독자 대비", "채널 기준선 대비"],
+            default="구독자 대비",
+            label_visibility="collapsed",
+        )
+
         st.caption("등급 필터")
         filter_grade = st.pills(
             "등급",
@@ -277,358 +651,299 @@ with st.sidebar:
         )
 
     # ---------------- 검색 로직 ----------------
-    now = datetime.now()
-
     if "search_trigger" in locals() and search_trigger:
-        if not query:
+        if local_mode and trending_mode:
+            # 트렌딩 차트는 API 전용, 로컬 검색은 키워드가 있어야 한다
+            st.warning("⚠️ 로컬 검색과 트렌딩 차트는 함께 사용할 수 없습니다.")
+        elif not query.strip() and not trending_mode:
             st.warning("⚠️ 키워드를 입력해주세요!")
-        elif not api_key:
+        elif not api_key and not local_mode:
             st.error("🔑 API 키가 설정되지 않았습니다.")
         else:
             try:
-                youtube = build("youtube", "v3", developerKey=api_key)
-
-                if days_filter == "1주일":
-                    published_after = (now - timedelta(days=7)).isoformat("T") + "Z"
-                elif days_filter == "1개월":
-                    published_after = (now - timedelta(days=30)).isoformat("T") + "Z"
-                elif days_filter == "3개월":
-                    published_after = (now - timedelta(days=90)).isoformat("T") + "Z"
+                if trending_mode:
+                    query = ""
+                    mode = "trending"
                 else:
-                    published_after = None
-
-                api_duration = "any"
-                if len(video_durations) == 1:
-                    api_duration = "short" if "쇼츠" in video_durations else "long"
-
-                all_video_ids = []
-
-                with st.spinner(f"📡 '{query}' 신호 분석 중..."):
-                    target_countries = [
-                        region_map[c] for c in country_options if c != "🌏전체"
-                    ]
-                    if "🌏전체" in country_options:
-                        target_countries.append(None)
-                    if not target_countries:
-                        target_countries = [None]
-
-                    for region_code in target_countries:
-                        per_country_max = min(
-                            50, max(10, int(max_results / len(target_countries)))
-                        )
-
-                        params = {
-                            "part": "snippet",
-                            "q": query,
-                            "maxResults": per_country_max,
-                            "order": "viewCount",
-                            "type": "video",
-                            "videoDuration": api_duration,
-                        }
-                        if published_after:
-                            params["publishedAfter"] = published_after
-                        if region_code:
-                            params["regionCode"] = region_code
-
-                        search_res = youtube.search().list(**params).execute()
-                        all_video_ids.extend(
-                            [item["id"]["videoId"] for item in search_res.get("items", [])]
+                    mode = "local" if local_mode else "compare" if compare_mode else "api"
+                trace = SearchTrace(query or "🔥 트렌딩")
+                st.session_state.search_trace = trace
+                st.session_state.trace_pending = True
+
+                with st.spinner(f"📡 '{query or '🔥 트렌딩'}' 신호 분석 중..."):
+                    # 같은 시간대의 같은 조건 검색은 다른 세션의 결과를 그대로 참조
+                    search_args = dict(
+                        mode=mode,
+                        query=query, regions=regions_for(country_options),
+                        max_results=max_results, days_filter=days_filter,
+                        durations=video_durations, grades=filter_grade,
+                        subs_range=subs_range, category=category,
+                        grade_basis=grade_basis,
+                        deep=deep_mode and mode == "api",
+                        deep_target=deep_target, quota_budget=quota_budget,
+                    )
+                    key = result_key(**search_args, hour=datetime.now().strftime("%Y%m%d%H"))
+                    shared = get_result_store().get(key)
+                    # 채널 기준선: 채널 최근 업로드 중앙 조회수 대비 배수로 등급 (구독자 수 무관)
+                    baselines = (
+                        get_channel_baselines() if grade_basis == "채널 기준선 대비" else None
+                    )
+                    stats, fetch_errors = None, {}
+                    if shared is not None:
+                        display, stats = shared
+                        trace.params = {"q": query, "shared": True}
+                        trace.result_rows = len(display)
+                    elif local_mode:
+                        # 쌓아둔 결과에서만 찾는다 (API 호출 없음)
+                        display, _, fetch_errors = run_local_search(
+                            get_local_index(), query,
+                            days_filter=days_filter,
+                            grades=filter_grade,
+                            subs_range=subs_range,
+                            category=category,
+                            trace=trace,
+                            snapshots=get_snapshot_store(),
+                            baselines=baselines,
                         )
-
-                    all_video_ids = list(set(all_video_ids))
-
-                    if not all_video_ids:
-                        st.error("신호 없음 (검색 결과 0건)")
-                        st.session_state.df_result = pd.DataFrame()
                     else:
-                        video_items = []
-                        chunks = [
-                            all_video_ids[i: i + 50]
-                            for i in range(0, len(all_video_ids), 50)
-                        ]
-                        for c in chunks:
-                            res = youtube.videos().list(
-                                part="statistics,snippet,contentDetails",
-                                id=",".join(c),
-                            ).execute()
-                            video_items.extend(res.get("items", []))
-
-                        channel_ids = list(
-                            set([item["snippet"]["channelId"] for item in video_items])
-                        )
-                        subs_map, video_count_map = {}, {}
-
-                        ch_chunks = [
-                            channel_ids[i: i + 50]
-                            for i in range(0, len(channel_ids), 50)
-                        ]
-                        for cc in ch_chunks:
-                            cres = youtube.channels().list(
-                                part="statistics", id=",".join(cc)
-                            ).execute()
-                            for ch in cres.get("items", []):
-                                stats = ch.get("statistics", {})
-                                subs_map[ch["id"]] = int(stats.get("subscriberCount", 0))
-                                video_count_map[ch["id"]] = int(stats.get("videoCount", 0))
-
-                        lst = []
-                        for item in video_items:
-                            vid = item["id"]
-                            snippet = item["snippet"]
-                            stats = item.get("statistics", {})
-                            channel_id = snippet["channelId"]
-
-                            view = int(stats.get("viewCount", 0))
-                            comment = int(stats.get("commentCount", 0))
-                            like_count = int(stats.get("likeCount", 0))
-                            subs = subs_map.get(channel_id, 0)
-                            perf = (view / subs * 100) if subs else 0
-
-                            # 등급
-                            if perf >= 1000:
-                                grade = "🚀 떡상중"
-                            elif perf >= 300:
-                                grade = "📈 급상승"
-                            elif perf >= 100:
-                                grade = "👀 주목"
-                            else:
-                                grade = "💤 일반"
-
-                            if not any(g in grade for g in filter_grade):
-                                continue
-
-                            if not (subs_range[0] <= subs <= subs_range[1]):
-                                continue
-
-                            raw_date = datetime.strptime(
-                                snippet["publishedAt"][:10], "%Y-%m-%d"
+                        # 키 풀: 쿼터 소진 키는 건너뛰고 일시적 오류는 백오프 재시도
+                        youtube = get_pool(parse_keys(api_key))
+                        cache = get_response_cache()
+                        store = get_entity_store()
+
+                        if mode == "trending":
+                            # 지역×카테고리 인기 차트 (search 없이 페이지당 1 유닛)
+                            display, _, fetch_errors = run_trending(
+                                youtube, cache,
+                                regions=regions_for(country_options),
+                                categories=[category] if category else None,
+                                max_pages=-(-max_results // 50),
+                                days_filter=days_filter,
+                                durations=video_durations,
+                                grades=filter_grade,
+                                subs_range=subs_range,
+                                store=store,
+                                trace=trace,
+                                snapshots=get_snapshot_store(),
+                                baselines=baselines,
+                                index=get_local_index(),
                             )
-                            days = (now - raw_date).days
-                            velocity = view / (days if days else 1)
-
-                            thumbnails = snippet["thumbnails"]
-                            thumb = thumbnails.get(
-                                "maxres",
-                                thumbnails.get(
-                                    "standard",
-                                    thumbnails.get("high", thumbnails.get("medium")),
-                                ),
-                            )["url"]
-
-                            # 🔹 카테고리 이름
-                            cat_id = snippet.get("categoryId")
-                            cat_name = CATEGORY_NAME_BY_ID.get(cat_id, "기타")
-
-                            lst.append(
-                                {
-                                    "raw_perf": perf,
-                                    "raw_view": view,
-                                    "raw_comment": comment,
-                                    "raw_like": like_count,
-                                    "raw_engagement": (comment / view * 100)
-                                    if view
-                                    else 0,
-                                    "raw_date": raw_date,
-                                    "thumbnail": thumb,
-                                    "title": snippet["title"],
-                                    "channel": snippet["channelTitle"],
-                                    "grade": grade,
-                                    "duration": parse_duration(
-                                        item["contentDetails"]["duration"]
-                                    ),
-                                    "vid": vid,
-                                    "총 영상 수": video_count_map.get(channel_id, 0),
-                                    "일일 속도": velocity,
-                                    "게시일": raw_date.strftime("%Y/%m/%d"),
-                                    "category": cat_name,
-                                }
+                        elif compare_mode:
+                            # 키워드들의 검색을 함께 돌리고 videos/channels는 한 번만 조회
+                            display, _, stats, fetch_errors = run_compare(
+                                youtube, cache, query.split(","),
+                                regions=regions_for(country_options),
+                                max_results=max_results,
+                                days_filter=days_filter,
+                                durations=video_durations,
+                                grades=filter_grade,
+                                subs_range=subs_range,
+                                category=category,
+                                store=store,
+                                trace=trace,
+                                snapshots=get_snapshot_store(),
+                                baselines=baselines,
+                                index=get_local_index(),
                             )
-
-                        lst = sorted(
-                            lst, key=lambda x: (x["raw_perf"], x["raw_date"]), reverse=True
-                        )
-
-                        display = []
-                        for i, r in enumerate(lst):
-                            display.append(
-                                {
-                                    "No": i + 1,
-                                    "썸네일": r["thumbnail"],
-                                    "채널명": r["channel"],
-                                    "제목": r["title"],
-                                    "카테고리": r["category"],   # 테이블용
-                                    "게시일": r["게시일"],
-                                    "총 영상 수": f"{r['총 영상 수']:,}개",
-                                    "조회수": f"{r['raw_view']:,}",
-                                    "성과도": r["raw_perf"],
-                                    "등급": r["grade"],
-                                    "길이": r["duration"],
-                                    "일일 속도": f"{int(r['일일 속도']):,}회",
-                                    "이동": f"https://www.youtube.com/watch?v={r['vid']}",
-                                    "ID": r["vid"],
-                                    "raw_view": r["raw_view"],
-                                    "raw_perf": r["raw_perf"],
-                                    "raw_comment": r["raw_comment"],
-                                    "raw_like": r["raw_like"],
-                                    "raw_engagement": r["raw_engagement"],
-                                }
+                        else:
+                            on_progress = None
+                            if deep_mode:
+                                progress = st.progress(0.0, text="🔎 딥 수집 중...")
+
+                                def on_progress(n, q):
+                                    progress.progress(
+                                        min(n / deep_target, 1.0),
+                                        text=f"🔎 {n:,} / {deep_target:,}개 · 쿼터 {q:,}",
+                                    )
+
+                            def on_partial(partial):
+                                max_perf = float(partial["raw_perf"].max()) if len(partial) else 0
+                                with live_results.container():
+                                    st.caption(
+                                        f"⏳ 수집 중... 지금까지 {len(partial):,}개 "
+                                        f"(상위 {PAGE_SIZES[0]}개 미리 표시)"
+                                    )
+                                    st.dataframe(
+                                        table_view(partial.head(PAGE_SIZES[0])),
+                                        use_container_width=True,
+                                        hide_index=True,
+                                        column_config=result_column_config(max_perf or 1000),
+                                    )
+
+                            display, _, fetch_errors = run_search(
+                                youtube, cache, query,
+                                regions=regions_for(country_options),
+                                max_results=max_results,
+                                days_filter=days_filter,
+                                durations=video_durations,
+                                grades=filter_grade,
+                                subs_range=subs_range,
+                                category=category,
+                                deep=deep_mode,
+                                deep_target=deep_target,
+                                quota_budget=quota_budget,
+                                store=store,
+                                trace=trace,
+                                on_progress=on_progress,
+                                snapshots=get_snapshot_store(),
+                                baselines=baselines,
+                                index=get_local_index(),
+                                on_partial=on_partial,
                             )
-
-                        st.session_state.df_result = pd.DataFrame(display)
+                            live_results.empty()
+                        # 새로 추적된 영상의 기준 스냅샷을 바로 찍도록 깨운다
+                        collector = get_snapshot_collector()
+                        collector.use(youtube)
+                        collector.poke()
+                    for label, err in fetch_errors.items():
+                        st.warning(f"⚠️ {label} 실패: {err}")
+                    if shared is None and display is not None:
+                        # 공유 결과는 처음 검색한 세션이, 로컬 검색 결과는 원래 검색이
+                        # 이미 아카이브에 남겼다
+                        if mode != "local":
+                            with trace.phase("archive"):
+                                get_result_archive().append(display, query, search_args, mode)
+                            get_archive_keywords.clear()
+                        if not fetch_errors:
+                            # 일부 요청이 실패한 결과는 공유하지 않는다
+                            display, stats = get_result_store().put(key, (display, stats))
+
+                    if display is None:
+                        if fetch_errors:
+                            st.error("검색 요청이 모두 실패했습니다.")
+                        else:
+                            st.error("신호 없음 (검색 결과 0건)")
+                        st.session_state.df_result = pd.DataFrame()
+                        st.session_state.keyword_stats = None
+                    else:
+                        st.session_state.df_result = display
+                        st.session_state.keyword_stats = stats
                         st.session_state.selected_index = 0
+                        # 새 결과마다 테이블 키를 바꿔 이전 선택 상태를 버린다
+                        st.session_state.result_version += 1
+                        max_perf = float(display["raw_perf"].max())
+                        st.session_state.max_perf = (
+                            1000 if max_perf == 0 or pd.isna(max_perf) else max_perf
+                        )
+                        if prefetch_transcripts:
+                            get_transcript_service().prefetch(display["vid"])
+
+                if shared is not None:
+                    store_info = get_result_store().stats()
+                    st.caption(
+                        f"♻️ 공유 결과 재사용 · 쿼터 0 · 저장소 {store_info['entries']}건 "
+                        f"{store_info['bytes'] / 2**20:,.1f}MB"
+                    )
+                elif local_mode:
+                    st.caption(
+                        f"💾 로컬 인덱스 {get_local_index().count():,}개에서 검색 · "
+                        f"{trace.phases.get('local', 0) * 1000:,.1f}ms · 쿼터 0"
+                    )
+                else:
+                    cache_stats = trace.cache_stats()
+                    client_info = client_stats(youtube.keys[0])
+                    pool_info = youtube.stats()
+                    st.caption(
+                        # 키 풀은 호출마다 get_client를 거치므로 재사용 횟수는 API 호출 기준
+                        f"🔌 API 호출 {client_info['reuse_count']:,}회 클라이언트 재사용 "
+                        f"(build {client_info['build_ms']:,.0f}ms는 키당 1회) · "
+                        f"🔑 키 {len(pool_info['keys'])}개 · 오늘 남은 쿼터 "
+                        f"{pool_info['remaining']:,} (재시도 {pool_info['retries']} · "
+                        f"교체 {pool_info['rotations']}) · "
+                        f"🧮 쿼터 {trace.quota:,} · ✂️ 구독자 범위 밖 {trace.pruned:,}개 "
+                        f"조회 생략 · 🗄️ 캐시 "
+                        + " · ".join(
+                            f"{ep} {v['hits']}/{v['hits'] + v['misses']}"
+                            for ep, v in cache_stats.items()
+                        )
+                    )
 
             except Exception as e:
+                if st.session_state.trace_pending:
+                    st.session_state.search_trace.error = str(e)
                 st.error(f"에러 발생: {e}")
 
     # ---------------- PREVIEW 렌더링 ----------------
     with preview_container:
-        df = st.session_state.df_result
-        selected_row = None
-
-        if df is not None and not df.empty:
-            idx = st.session_state.get("selected_index", 0)
-            if idx is None or idx >= len(df):
-                idx = 0
-                st.session_state.selected_index = 0
-            selected_row = df.iloc[idx]
-
-        if selected_row is None:
-            st.info("테이블에서 영상을 선택하거나 검색을 실행하면 여기 미리보기가 표시됩니다.")
-        else:
-            st.markdown(
-                f"""
-                <h2 style="
-                    margin: 4px 0 12px 0;
-                    color: #7DF9FF;
-                    line-height: 1.4;
-                    font-weight: 700;
-                    text-align: center;
-                    text-shadow:
-                        0 0 6px rgba(56, 189, 248, 0.9),
-                        0 0 14px rgba(56, 189, 248, 0.8),
-                        0 0 24px rgba(56, 189, 248, 0.7);
-                ">
-                    {selected_row['제목']}
-                </h2>
-                """,
-                unsafe_allow_html=True,
-            )
-
-            channel_name = selected_row["채널명"]
-            total_videos = selected_row["총 영상 수"]
-            published = selected_row["게시일"]
-            perf_str = f"{selected_row['raw_perf']:,.0f}%"
-            views_str = f"{selected_row['raw_view']:,}"
-            eng_str = f"{float(selected_row['raw_engagement']):.2f}%"
-            likes_str = f"{int(selected_row['raw_like']):,}"
-            url = selected_row["이동"]
-
-            summary_html = f"""
-            <div class="summary-bar">
-                <div class="summary-left">
-                    <span>📺 <b>{channel_name}</b></span>
-                    <span>· 총 {total_videos}</span>
-                    <span>· 📅 {published}</span>
-                </div>
-                <div class="summary-right">
-                    <span class="chip chip-hot">🔥 {perf_str}</span>
-                    <span class="chip chip-view">👁 {views_str}</span>
-                    <span class="chip chip-like">👍 {likes_str}</span>
-                    <span class="chip chip-eng">💬 {eng_str}</span>
-                    <a class="summary-link" href="{url}" target="_blank">유튜브에서 보기</a>
-                </div>
-            </div>
-            """
-            st.markdown(summary_html, unsafe_allow_html=True)
-
-            youtube_embed = f"https://www.youtube.com/embed/{selected_row['ID']}"
-            st.markdown(
-                f"""
-                <div class="video-wrapper">
-                    <iframe
-                        src="{youtube_embed}"
-                        frameborder="0"
-                        allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
-                        allowfullscreen>
-                    </iframe>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+        render_preview()
 
 # -------------------------------------------------------------------------
-# ▶ 메인 영역: 테이블
+# ▶ 메인 영역: 키워드 비교 + 테이블
 # -------------------------------------------------------------------------
-df = st.session_state.df_result
-
-st.markdown("### 📊 전체 영상 리스트")
-
-if df is None or df.empty:
-    st.info("검색 결과가 없습니다. 사이드바에서 검색을 실행해주세요.")
-else:
-    # 좋아요 표시용 컬럼
-    if "좋아요" not in df.columns and "raw_like" in df.columns:
-        df["좋아요"] = df["raw_like"].apply(lambda x: f"{int(x):,}")
-
-    max_perf = df["raw_perf"].max() if len(df) > 0 else 1000
-    if max_perf == 0 or pd.isna(max_perf):
-        max_perf = 1000
-
-    selected = st.dataframe(
-        df,
-        height=1100,  # 50개 가까이까지 넉넉히 보이도록
+stats = st.session_state.keyword_stats
+if stats is not None:
+    st.markdown("### 🆚 키워드 비교")
+    st.dataframe(
+        stats,
         use_container_width=True,
-        selection_mode="single-row",
-        on_select="rerun",
-        hide_index=True,
-        column_order=[
-            "No",
-            "썸네일",
-            "채널명",
-            "제목",
-            "카테고리",
-            "게시일",
-            "총 영상 수",
-            "조회수",
-            "좋아요",
-            "성과도",
-            "등급",
-            "길이",
-            "일일 속도",
-            "이동",
-        ],
         column_config={
-            "No": st.column_config.TextColumn("No", width=40),
-            "썸네일": st.column_config.ImageColumn("썸네일", width=80),
-            "채널명": st.column_config.TextColumn("채널명", width=140),
-            "제목": st.column_config.TextColumn("제목", width=320),
-            "카테고리": st.column_config.TextColumn("카테고리", width=90),
-            "게시일": st.column_config.TextColumn("게시일", width=90),
-            "총 영상 수": st.column_config.TextColumn("총 영상 수", width=90),
-            "조회수": st.column_config.TextColumn("조회수", width=100),
-            "좋아요": st.column_config.TextColumn("좋아요", width=90),
-            "성과도": st.column_config.ProgressColumn(
-                "성과도",
-                format="%.0f%%",
-                min_value=0,
-                max_value=max_perf,
-                width=110,
-            ),
-            "등급": st.column_config.TextColumn("등급", width=90),
-            "길이": st.column_config.TextColumn("길이", width=70),
-            "일일 속도": st.column_config.TextColumn("일일 속도", width=110),
-            "이동": st.column_config.LinkColumn(
-                "이동", display_text="▶", width=50
-            ),
-            # 내부 RAW 컬럼 숨김
-            "ID": None,
-            "raw_view": None,
-            "raw_perf": None,
-            "raw_comment": None,
-            "raw_like": None,
-            "raw_engagement": None,
+            "중앙 성과도": st.column_config.NumberColumn("중앙 성과도", format="%.1f%%"),
+            "중앙 조회수": st.column_config.NumberColumn("중앙 조회수", format="localized"),
         },
     )
 
-    if selected.selection.rows:
-        st.session_state.selected_index = selected.selection.rows[0]
+render_results()
+
+# -------------------------------------------------------------------------
+# ▶ 아카이브 내보내기 (누적된 검색 결과를 조건으로 골라 스트리밍 다운로드)
+# -------------------------------------------------------------------------
+archive_keywords = get_archive_keywords()
+if archive_keywords:
+    with st.expander("🗄️ 검색 결과 아카이브", expanded=False):
+        a1, a2, a3 = st.columns([2, 2, 1])
+        with a1:
+            archive_keyword = st.selectbox("키워드", ["(전체)", *archive_keywords])
+        with a2:
+            archive_dates = st.date_input("기간", value=())
+        with a3:
+            archive_min_perf = st.number_input("성과도 ≥ (%)", min_value=0, value=0, step=100)
+        since, until = (list(archive_dates) + [None, None])[:2]
+        st.download_button(
+            "⬇️ 조회 결과 Parquet",
+            # 아카이브 스캔은 버튼을 눌렀을 때만 (재실행마다 디렉터리를 훑지 않도록)
+            data=lambda: export_archive(
+                None if archive_keyword == "(전체)" else archive_keyword,
+                since, until or since, archive_min_perf,
+            ),
+            file_name=f"signal_archive_{datetime.now():%Y%m%d_%H%M}.parquet",
+            mime="application/vnd.apache.parquet",
+            on_click="ignore",
+        )
+
+# -------------------------------------------------------------------------
+# ▶ 검색 성능 / 쿼터 패널
+# -------------------------------------------------------------------------
+trace = st.session_state.search_trace
+if trace is not None:
+    if st.session_state.trace_pending:
+        # 결과 없이 끝난 검색(0건/에러)도 기록
+        trace.write_jsonl()
+        st.session_state.trace_pending = False
+
+    info = trace.to_dict()
+    total_ms = sum(info["phases_ms"].values())
+    with st.expander(
+        f"⏱️ 검색 성능 · {total_ms:,.0f}ms · HTTP {info['http_calls']}회 · "
+        f"쿼터 {info['quota']:,}",
+        expanded=False,
+    ):
+        m1, m2, m3, m4, m5 = st.columns(5)
+        m1.metric("HTTP 호출", f"{info['http_calls']:,}")
+        m2.metric("수신 / 송신", f"{info['bytes_in'] / 1024:,.1f} / "
+                              f"{info['bytes_out'] / 1024:,.1f} KB")
+        m3.metric("응답 파싱", f"{info['parse_ms']:,.1f} ms")
+        m4.metric("쿼터", f"{info['quota']:,}")
+        m5.metric("캐시/저장소 히트", f"{info['cache_hits']:,} / {info['store_hits']:,}")
+
+        st.caption("단계별 시간 (ms)")
+        st.bar_chart(pd.Series(info["phases_ms"], name="ms"), horizontal=True)
+
+        if info["calls"]:
+            st.caption("호출별 상세")
+            st.dataframe(
+                pd.DataFrame(info["calls"]).sort_values("ms", ascending=False),
+                hide_index=True,
+                use_container_width=True,
+            )
+        if info["error"]:
+            st.error(info["error"])
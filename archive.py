@@ -0,0 +1,283 @@
+"""검색 결과 누적 아카이브 (append-only, 날짜/키워드 파티션 Parquet) + 스트리밍 내보내기.
+
+검색이 끝날 때마다 압축 결과 프레임(수치 컬럼)과 검색 조건을 파일 하나로 덧붙인다.
+    archive/date=2026-01-31/keyword=먹방/<search_id>-0.parquet
+
+읽을 때는 pyarrow.dataset으로 파티션(날짜/키워드)과 Parquet 행 그룹 통계를 이용해
+필요한 파일/행 그룹만 읽는다 (predicate pushdown).
+
+예) 오프라인 분석용으로 디스크에 바로 스트리밍:
+    python archive.py -o 먹방.parquet --keyword 먹방 --since 2026-01-01
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from yt_cache import CACHE_DIR
+
+ARCHIVE_DIR = os.environ.get("SIGNAL_ARCHIVE_DIR", os.path.join(CACHE_DIR, "archive"))
+# 내보내기 / 스캔 단위 (Parquet 행 그룹 하나 = 배치 하나)
+ROW_GROUP_SIZE = 10_000
+TRENDING_KEYWORD = "_trending"
+
+# 파일마다 스키마가 달라지지 않도록 선택 컬럼(keyword/기준선/증가량)도 항상 둔다
+RESULT_SCHEMA = pa.schema([
+    ("vid", pa.string()),
+    ("title", pa.string()),
+    ("channel", pa.string()),
+    ("category", pa.string()),
+    ("grade", pa.string()),
+    ("raw_date", pa.timestamp("ms")),
+    ("view", pa.int64()),
+    ("like", pa.int64()),
+    ("comment", pa.int64()),
+    ("video_count", pa.int32()),
+    ("raw_perf", pa.float32()),
+    ("raw_engagement", pa.float32()),
+    ("raw_baseline", pa.float32()),
+    ("velocity", pa.int64()),
+    ("duration_sec", pa.float32()),
+    ("views_1h", pa.int64()),
+    ("views_24h", pa.int64()),
+])
+ARCHIVE_SCHEMA = pa.schema([
+    ("search_id", pa.string()),
+    ("searched_at", pa.timestamp("s")),
+    ("mode", pa.string()),
+    ("params", pa.string()),
+    *RESULT_SCHEMA,
+    ("date", pa.string()),
+    ("keyword", pa.string()),
+])
+_PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("keyword", pa.string())]), flavor="hive"
+)
+
+
+def result_batches(compact: pd.DataFrame, schema=RESULT_SCHEMA, size=ROW_GROUP_SIZE,
+                   **constants):
+    """압축 결과 프레임 → size행씩 RecordBatch (전체를 한 번에 Arrow로 바꾸지 않는다).
+
+    schema에 있지만 프레임에 없는 컬럼은 null, constants는 모든 행에 같은 값으로 채운다.
+    """
+    for start in range(0, len(compact), size):
+        part = compact.iloc[start:start + size]
+        columns = {}
+        for field in schema:
+            if field.name in constants:
+                values = [constants[field.name]] * len(part)
+            elif field.name in part:
+                values = part[field.name]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(object)
+            else:
+                values = [None] * len(part)
+            columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class ResultArchive:
+    """검색 결과 Parquet 아카이브. 쓰기는 항상 새 파일 추가라 여러 프로세스가 같이 써도 된다."""
+
+    def __init__(self, root=None):
+        self.root = root or ARCHIVE_DIR
+
+    def append(self, compact: pd.DataFrame, keyword: str, params: dict, mode="api",
+               searched_at=None) -> str:
+        """검색 결과 한 건을 덧붙인다. 비교 모드(keyword 컬럼)는 행마다 그 키워드 파티션으로.
+
+        반환: search_id
+        """
+        search_id = uuid.uuid4().hex
+        if compact is None or compact.empty:
+            return search_id
+        searched_at = (searched_at or datetime.now()).replace(microsecond=0)
+        constants = {
+            "search_id": search_id,
+            "searched_at": searched_at,
+            "mode": mode,
+            "params": json.dumps(params, sort_keys=True, ensure_ascii=False, default=str),
+            "date": searched_at.strftime("%Y-%m-%d"),
+        }
+        if "keyword" not in compact:
+            constants["keyword"] = keyword or TRENDING_KEYWORD
+        table = pa.Table.from_batches(
+            list(result_batches(compact, ARCHIVE_SCHEMA, **constants)), ARCHIVE_SCHEMA
+        )
+        ds.write_dataset(
+            table, self.root, format="parquet", partitioning=_PARTITIONING,
+            basename_template=f"{search_id}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=ROW_GROUP_SIZE,
+        )
+        return search_id
+
+    def dataset(self):
+        """아카이브 전체 Dataset (아직 아무것도 없으면 None)."""
+        if not os.path.isdir(self.root):
+            return None
+        return ds.dataset(self.root, format="parquet", partitioning=_PARTITIONING,
+                          schema=ARCHIVE_SCHEMA)
+
+    def scanner(self, keyword=None, since=None, until=None, columns=None, where=None):
+        """조건에 맞는 행만 읽는 Scanner. 날짜/키워드는 디렉터리 단위로 건너뛴다.
+
+        since/until은 "YYYY-MM-DD" (포함), where는 추가 pyarrow.dataset 식
+        (예: ds.field("raw_perf") >= 300 — 행 그룹 통계로 걸러짐).
+        """
+        dataset = self.dataset()
+        if dataset is None:
+            return None
+        expr = ds.scalar(True)
+        if keyword:
+            expr &= ds.field("keyword") == keyword
+        if since:
+            expr &= ds.field("date") >= str(since)
+        if until:
+            expr &= ds.field("date") <= str(until)
+        if where is not None:
+            expr &= where
+        return dataset.scanner(columns=columns, filter=expr, batch_size=ROW_GROUP_SIZE)
+
+    def keywords(self):
+        """아카이브에 있는 키워드 파티션 목록 (파일을 열지 않고 디렉터리만 본다)."""
+        if not os.path.isdir(self.root):
+            return []
+        found = set()
+        for date_dir in os.scandir(self.root):
+            if not (date_dir.is_dir() and date_dir.name.startswith("date=")):
+                continue
+            for keyword_dir in os.scandir(date_dir.path):
+                if keyword_dir.is_dir() and keyword_dir.name.startswith("keyword="):
+                    # hive 파티션 값은 URL 인코딩되어 있다
+                    found.add(unquote(keyword_dir.name[len("keyword="):]))
+        return sorted(found)
+
+
+# -------------------------------------------------------------------------
+# 스트리밍 내보내기
+# -------------------------------------------------------------------------
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter/IPC writer가 쓴 바이트를 모아 두었다가 take()로 넘기는 쓰기 전용 스트림."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks = []
+        return out
+
+
+def iter_export(batches, schema, fmt="parquet"):
+    """RecordBatch 이터레이터 → 파일 바이트 조각 제너레이터 (배치마다 행 그룹 하나).
+
+    fmt: "parquet" 또는 "arrow" (Arrow IPC 스트림). 메모리에는 배치 하나만 올라간다.
+    """
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if batch.num_rows:
+                writer.write_batch(batch)
+                chunk = sink.take()
+                if chunk:
+                    yield chunk
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+class StreamReader(io.RawIOBase):
+    """바이트 조각 제너레이터를 읽기용 파일 객체로 (st.download_button 등에 그대로 전달)."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def export_result(compact: pd.DataFrame, fmt="parquet") -> StreamReader:
+    """현재 결과(압축 프레임)를 행 그룹 단위로 직렬화하는 읽기 스트림."""
+    schema = RESULT_SCHEMA
+    if "keyword" in compact:
+        schema = schema.insert(1, pa.field("keyword", pa.string()))
+    return StreamReader(iter_export(result_batches(compact, schema), schema, fmt))
+
+
+def export_query(scanner, fmt="parquet") -> StreamReader:
+    """아카이브 조회(ResultArchive.scanner) 결과를 행 그룹 단위로 직렬화하는 읽기 스트림."""
+    return StreamReader(iter_export(scanner.to_batches(), scanner.projected_schema, fmt))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SIGNAL 결과 아카이브 내보내기")
+    p.add_argument("-o", "--out", required=True,
+                   help="출력 파일 (.parquet 또는 .arrow)")
+    p.add_argument("--keyword", default=None)
+    p.add_argument("--since", default=None, help="YYYY-MM-DD (포함)")
+    p.add_argument("--until", default=None, help="YYYY-MM-DD (포함)")
+    p.add_argument("--min-perf", type=float, default=None, help="성과도(%%) 하한")
+    p.add_argument("--root", default=None, help=f"아카이브 경로 (기본: {ARCHIVE_DIR})")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    where = None if args.min_perf is None else ds.field("raw_perf") >= args.min_perf
+    scanner = ResultArchive(args.root).scanner(
+        keyword=args.keyword, since=args.since, until=args.until, where=where
+    )
+    if scanner is None:
+        print("⚠️ 아카이브가 비어 있습니다.", file=sys.stderr)
+        return 2
+    fmt = "arrow" if args.out.endswith((".arrow", ".arrows")) else "parquet"
+    written = 0
+    with open(args.out, "wb") as f:
+        for chunk in iter_export(scanner.to_batches(), scanner.projected_schema, fmt):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"📦 {args.out} ({written / 2**20:,.1f}MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""키워드 파일을 브라우저 없이 일괄 검색해 점수 결과를 Parquet/CSV로 저장.
+
+예)
+    python batch_runner.py keywords.txt -o report.parquet --regions KR,JP --period 1주일
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from entity_store import EntityStore
+from key_pool import get_pool, parse_keys
+from pipeline import CATEGORY_MAP, PERIOD_DAYS, run_search
+from scoring import GRADES
+from search_trace import SearchTrace
+from yt_cache import ResponseCache
+
+PERIOD_ALIASES = {"week": "1주일", "month": "1개월", "quarter": "3개월", "all": "전체"}
+DURATION_ALIASES = {"short": "쇼츠", "long": "롱폼"}
+
+
+def read_keywords(path: str):
+    """한 줄에 키워드 하나. 빈 줄과 # 주석은 무시, 중복은 처음 것만."""
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return list(dict.fromkeys(k for k in lines if k and not k.startswith("#")))
+
+
+def run_batch(youtube, keywords, *, workers=4, cache=None, store=None,
+              trace_log=None, log=print, **search_kwargs):
+    """키워드들을 스레드 풀로 검색.
+
+    반환: (scored DataFrame — keyword 컬럼 포함, {keyword: 에러 목록})
+    """
+    cache = cache or ResponseCache()
+    store = store or EntityStore()
+    frames, failures = [], {}
+
+    def one(keyword):
+        trace = SearchTrace(keyword)
+        try:
+            _, scored, errors = run_search(
+                youtube, cache, keyword, store=store, trace=trace, **search_kwargs
+            )
+        except Exception as e:
+            trace.error = str(e)
+            raise
+        finally:
+            trace.write_jsonl(trace_log)
+        return scored, errors, trace
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(one, k): k for k in keywords}
+        for fut in as_completed(futures):
+            keyword = futures[fut]
+            try:
+                scored, errors, trace = fut.result()
+            except Exception as e:
+                failures[keyword] = [str(e)]
+                log(f"✗ {keyword}: {e}")
+                continue
+            if errors:
+                failures[keyword] = [f"{k}: {v}" for k, v in errors.items()]
+            rows = 0 if scored is None else len(scored)
+            log(f"✓ {keyword}: {rows}건 · 쿼터 {trace.quota:,} · HTTP {trace.http_calls}회")
+            if rows:
+                frames.append(scored.assign(keyword=keyword))
+
+    if not frames:
+        return pd.DataFrame(), failures
+    return pd.concat(frames, ignore_index=True), failures
+
+
+def write_result(df: pd.DataFrame, path: str):
+    """확장자에 따라 Parquet(.parquet) 또는 CSV로 저장."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def _split(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SIGNAL 키워드 일괄 분석")
+    p.add_argument("keywords", help="키워드 파일 (한 줄에 하나)")
+    p.add_argument("-o", "--out", required=True, help="결과 파일 (.parquet 또는 .csv)")
+    p.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"),
+                   help="YouTube API 키, 여러 개는 콤마 구분 (기본: $YOUTUBE_API_KEY)")
+    p.add_argument("--regions", default="KR",
+                   help="지역 코드 콤마 구분, ALL = 지역 제한 없음 (기본: KR)")
+    p.add_argument("--period", default="1개월",
+                   choices=list(PERIOD_DAYS) + list(PERIOD_ALIASES))
+    p.add_argument("--durations", default="쇼츠",
+                   help="쇼츠/롱폼 (short/long) 콤마 구분")
+    p.add_argument("--grades", default=",".join(GRADES), help="포함할 등급 콤마 구분")
+    p.add_argument("--category", default="전체",
+                   help="카테고리 이름(예: 게임) 또는 videoCategoryId (기본: 전체)")
+    p.add_argument("--subs-min", type=int, default=0)
+    p.add_argument("--subs-max", type=int, default=10**12)
+    p.add_argument("--max-results", type=int, default=50)
+    p.add_argument("--deep", action="store_true", help="nextPageToken 딥 수집")
+    p.add_argument("--deep-target", type=int, default=500)
+    p.add_argument("--quota-budget", type=int, default=2_000,
+                   help="키워드당 쿼터 예산 (딥 수집)")
+    p.add_argument("--workers", type=int, default=4, help="동시에 처리할 키워드 수")
+    p.add_argument("--trace-log", default=None, help="트레이스 JSONL 경로")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.api_key:
+        print("🔑 API 키가 없습니다 (--api-key 또는 YOUTUBE_API_KEY).", file=sys.stderr)
+        return 2
+
+    keywords = read_keywords(args.keywords)
+    if not keywords:
+        print("⚠️ 키워드 파일이 비어 있습니다.", file=sys.stderr)
+        return 2
+
+    regions = [None if r.upper() == "ALL" else r.upper() for r in _split(args.regions)]
+    started = time.perf_counter()
+    df, failures = run_batch(
+        get_pool(parse_keys(args.api_key)),
+        keywords,
+        workers=args.workers,
+        trace_log=args.trace_log,
+        regions=regions or [None],
+        max_results=args.max_results,
+        days_filter=PERIOD_ALIASES.get(args.period, args.period),
+        durations=[DURATION_ALIASES.get(d, d) for d in _split(args.durations)],
+        grades=_split(args.grades),
+        subs_range=(args.subs_min, args.subs_max),
+        category=CATEGORY_MAP.get(args.category, args.category),
+        deep=args.deep,
+        deep_target=args.deep_target,
+        quota_budget=args.quota_budget,
+    )
+    write_result(df, args.out)
+    print(
+        f"📦 {len(keywords)}개 키워드 · {len(df):,}건 → {args.out} "
+        f"({time.perf_counter() - started:,.1f}s)"
+    )
+    for keyword, errors in failures.items():
+        for err in errors:
+            print(f"⚠️ {keyword}: {err}", file=sys.stderr)
+    return 1 if failures and df.empty else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""오프라인 파이프라인 벤치마크 (API 키 / 쿼터 없이 단계별 지연·최대 메모리 측정).
+
+단계: fetch(검색+videos/channels, 응답 캐시 비움) → scoring(정규화+점수+필터)
+      → dataframe(to_compact) → render(첫 페이지 format_display + Arrow 직렬화)
+
+예)
+    python benchmark.py                         # 10 / 100 / 1k / 10k 합성 영상
+    python benchmark.py --sizes 1000 --latency-ms 80 --repeat 5
+    python benchmark.py --fixture fixtures/먹방.json.gz
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pyarrow as pa
+
+from api_fields import FIELDS
+from pipeline import CATEGORY_NAME_BY_ID
+from replay import ReplayClient, SyntheticClient
+from scoring import (
+    GRADES,
+    filter_mask,
+    format_display,
+    normalize_items,
+    score,
+    to_compact,
+)
+from yt_cache import ResponseCache
+from yt_fetch import collect, deep_collect
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000)
+STAGES = ("fetch", "scoring", "dataframe", "render")
+# 합성 데이터의 기준 시각 (결과가 실행 날짜에 따라 달라지지 않도록 고정)
+BENCH_NOW = datetime(2025, 1, 1)
+# app.py 결과 테이블의 기본 페이지 크기 (숨김 컬럼 제외하고 이만큼만 브라우저로 보냄)
+RENDER_PAGE_SIZE = 50
+
+
+def render_prep(compact):
+    """app.py 검색 직후 처리(성과도 최대값) + 첫 페이지 포맷과 Arrow 직렬화(st.dataframe)."""
+    max_perf = compact["raw_perf"].max() if len(compact) > 0 else 1000
+    page = format_display(compact.iloc[:RENDER_PAGE_SIZE])
+    page = page[[c for c in page.columns if c != "ID" and not c.startswith("raw_")]]
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(page)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size, max_perf
+
+
+def synthetic_params(size):
+    """합성 데이터용 검색 파라미터 (size가 한 페이지를 넘으면 딥 수집)."""
+    return {
+        "part": "snippet", "q": "bench", "maxResults": min(50, max(size, 10)),
+        "order": "viewCount", "type": "video", "videoDuration": "any",
+        "fields": FIELDS["search"],
+    }
+
+
+def fixture_params(searches):
+    """녹화된 search 파라미터 → (기본 파라미터, 지역 목록, 딥 수집 목표 수)"""
+    base = {k: v for k, v in searches[0].items() if k not in ("regionCode", "pageToken")}
+    regions = list(dict.fromkeys(p.get("regionCode") for p in searches))
+    deep = any("pageToken" in p for p in searches)
+    target = len(searches) * base["maxResults"] if deep else base["maxResults"]
+    return base, regions, target
+
+
+def run_once(youtube, params, regions=(None,), target=None, memory=False):
+    """파이프라인 한 번 실행. 반환: {단계: (초, 최대 메모리 바이트)}, 결과 행 수
+
+    memory=True면 tracemalloc으로 단계별 최대 메모리를 잰다 (그만큼 느려지므로
+    지연 측정 실행과는 따로 돌린다).
+
+    target이 한 페이지(maxResults × 지역 수)보다 크면 deep_collect로 페이지를 넘긴다.
+    """
+    regions = list(regions)
+    deep = target is not None and target > params["maxResults"] * len(regions)
+
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(path=f"{tmp}/cache.sqlite")
+
+        def fetch():
+            if deep:
+                return deep_collect(youtube, cache, params, regions,
+                                    target=target, quota_budget=10**9)
+            return collect(youtube, cache, params, regions)
+
+        video_items, channel_items, _, _ = _measure(out, "fetch", fetch, memory)
+        scored = _measure(out, "scoring",
+                          lambda: _score(video_items, channel_items), memory)
+        display = _measure(out, "dataframe",
+                           lambda: to_compact(scored, CATEGORY_NAME_BY_ID), memory)
+        _measure(out, "render", lambda: render_prep(display), memory)
+    return out, len(display)
+
+
+def _score(video_items, channel_items):
+    scored = score(normalize_items(video_items, channel_items), BENCH_NOW)
+    return scored[filter_mask(scored, GRADES, (0, 10**12))]
+
+
+def _measure(out, stage, fn, memory):
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+    finally:
+        if memory:
+            tracemalloc.stop()
+    out[stage] = (elapsed, peak)
+    return result
+
+
+def bench(make_client, size, params, repeat=3, **kwargs):
+    """repeat회 실행한 단계별 중앙값 지연(ms) + 별도 1회 실행의 최대 메모리(MB)."""
+    runs, rows = [], 0
+    for _ in range(repeat):
+        stages, rows = run_once(make_client(), params, **kwargs)
+        runs.append(stages)
+    mem, _ = run_once(make_client(), params, memory=True, **kwargs)
+    report = {"size": size, "rows": rows, "repeat": repeat}
+    for stage in STAGES:
+        report[f"{stage}_ms"] = round(
+            statistics.median(r[stage][0] for r in runs) * 1000, 2
+        )
+        report[f"{stage}_mb"] = round(mem[stage][1] / 2**20, 2)
+    report["total_ms"] = round(sum(report[f"{s}_ms"] for s in STAGES), 2)
+    return report
+
+
+def print_table(reports):
+    header = ["size", "rows", *(f"{s}_ms" for s in STAGES), "total_ms",
+              *(f"{s}_mb" for s in STAGES)]
+    print(" ".join(f"{h:>12}" for h in header))
+    for r in reports:
+        print(" ".join(f"{r[h]:>12,}" for h in header))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SIGNAL 파이프라인 오프라인 벤치마크")
+    p.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                   help="합성 영상 수 콤마 구분 (기본: 10,100,1000,10000)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--latency-ms", type=float, default=0.0,
+                   help="API 호출마다 더할 가상 네트워크 지연")
+    p.add_argument("--fixture", default=None,
+                   help="RecordingClient로 녹화한 응답(.json.gz)을 재생")
+    p.add_argument("--json", default=None, help="결과를 JSON 파일로도 저장")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    latency = args.latency_ms / 1000
+
+    reports = []
+    if args.fixture:
+        # 녹화 당시 search 파라미터를 그대로 써야 캐시 키(정규화 파라미터)가 맞는다
+        replay = ReplayClient.load(args.fixture, latency)
+        if not replay.searches:
+            print("⚠️ 녹화된 검색이 없습니다.", file=sys.stderr)
+            return 2
+        params, regions, target = fixture_params(replay.searches)
+        reports.append(bench(
+            lambda: ReplayClient(replay.responses, latency),
+            target, params, repeat=args.repeat, regions=regions, target=target,
+        ))
+    else:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            reports.append(bench(
+                lambda: SyntheticClient(size, latency=latency, now=BENCH_NOW),
+                size, synthetic_params(size), repeat=args.repeat, target=size,
+            ))
+
+    print_table(reports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""채널 기준선: 채널 최근 업로드 조회수의 중앙값/백분위 (업로드 재생목록 증분 동기화).
+
+성과도(조회수 ÷ 구독자)는 구독자 수를 숨겼거나 아주 적은 채널에서 의미가 없으므로,
+"이 채널이 평소에 얼마나 나오는지" 대비 배수를 대신 쓸 수 있게 한다.
+
+- 업로드 재생목록 ID는 채널 ID의 UC → UU라 channels().list 없이 바로 읽는다
+- 채널마다 playlistItems 첫 페이지(최근 50개)만 보고, 이미 저장된 업로드가 나오면 멈춘다
+- 조회수는 새 업로드 + 아직 크는 중인 최근 업로드만 videos().list로 채널 구분 없이 50개씩 묶어 조회
+- 조회수를 받은 시각을 같이 저장해, 게시 후 MATURE_DAYS 전에 받은 값은 기준선에 쓰지 않고
+  다음 동기화 때 다시 받는다 (동기화가 뜸한 채널의 초기 조회수가 그대로 굳지 않도록)
+- SYNC_MAX_AGE 안에 동기화한 채널은 API를 부르지 않는다
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from api_fields import FIELDS
+from search_trace import SearchTrace
+from yt_cache import CACHE_DIR
+from yt_client import measured_execute, thread_http
+from yt_fetch import CHUNK_SIZE, chunked, run_concurrent, stats_call
+
+BASELINE_UPLOADS = 50          # 채널당 기준선에 쓰는 최근 업로드 수 (playlistItems 한 페이지)
+SYNC_MAX_AGE = 12 * 60 * 60    # 이보다 최근에 동기화한 채널은 건너뜀
+GROWING_DAYS = 7               # 게시 후 이 기간 안의 업로드는 동기화 때 조회수를 다시 받음
+MATURE_DAYS = 3                # 게시 후 이 기간이 지난 업로드만 기준선 계산에 사용
+MIN_UPLOADS = 5                # 기준선을 내기 위한 최소 업로드 수
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id TEXT PRIMARY KEY,
+    latest_published TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    channel_id TEXT NOT NULL,
+    vid TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    view INTEGER,
+    viewed_at TEXT,
+    PRIMARY KEY (channel_id, vid)
+) WITHOUT ROWID;
+"""
+# 게시 후 MATURE_DAYS가 지나서 받은 조회수인지 (published_at / viewed_at은 ISO 8601 UTC)
+_MATURE_VIEW = (
+    f"viewed_at >= strftime('%Y-%m-%dT%H:%M:%SZ', published_at, '+{MATURE_DAYS} days')"
+)
+
+
+def uploads_playlist_id(channel_id: str) -> str:
+    """채널 ID(UC...) → 업로드 재생목록 ID(UU...)."""
+    return "UU" + channel_id[2:] if channel_id.startswith("UC") else channel_id
+
+
+class ChannelBaselines:
+    """채널별 최근 업로드 조회수를 보관하고 기준선(중앙값/백분위)을 계산 (스레드 안전한 SQLite)."""
+
+    def __init__(self, path=None, sync_max_age=SYNC_MAX_AGE):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "channel_baseline.sqlite")
+        self.path = path
+        self.sync_max_age = sync_max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(uploads)")}
+        if "viewed_at" not in columns:
+            # 이전 버전 저장소: 받은 시각이 없는 조회수는 다음 동기화에서 다시 받는다
+            self._conn.execute("ALTER TABLE uploads ADD COLUMN viewed_at TEXT")
+        self._conn.commit()
+
+    # ---------------- 동기화 ----------------
+    def stale(self, channel_ids):
+        """동기화가 필요한 채널과 각 채널의 마지막 업로드 게시 시각. 반환: {channel_id: latest}"""
+        ids = list(dict.fromkeys(channel_ids))
+        cutoff = time.time() - self.sync_max_age
+        known = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i: i + 500]
+                known.update(
+                    (cid, (latest, synced)) for cid, latest, synced in self._conn.execute(
+                        "SELECT channel_id, latest_published, synced_at FROM channels "
+                        f"WHERE channel_id IN ({','.join('?' * len(part))})",
+                        part,
+                    )
+                )
+        return {
+            cid: known[cid][0] if cid in known else None
+            for cid in ids
+            if cid not in known or known[cid][1] < cutoff
+        }
+
+    def sync(self, youtube, channel_ids, trace=None):
+        """오래된 채널만 업로드 재생목록을 증분으로 읽고 조회수를 갱신.
+
+        반환: (동기화한 채널 수, {요청 label: 에러 메시지})
+        """
+        trace = trace or SearchTrace("baseline-sync")
+        stale = self.stale(channel_ids)
+        if not stale:
+            return 0, {}
+
+        tasks = [
+            (cid, _playlist_call(youtube, cid, latest, trace))
+            for cid, latest in stale.items()
+        ]
+        results, failed = run_concurrent(tasks)
+        errors = {f"playlistItems[{cid}]": e for cid, e in failed.items()}
+
+        new_uploads = [(cid, vid, pub) for cid, ups in results.items() for vid, pub in ups]
+        # 새 업로드 + 아직 조회수가 크는 최근 업로드를 채널 구분 없이 50개씩 묶는다
+        owner = {vid: cid for cid, vid, _ in new_uploads}
+        owner.update(self._growing(list(results)))
+        stat_ids = list(owner)
+        stat_tasks = [
+            (f"baseline[{i}]", stats_call(youtube, chunk, f"baseline[{i}]", trace))
+            for i, chunk in enumerate(chunked(stat_ids, CHUNK_SIZE))
+        ]
+        stats, stat_errors = run_concurrent(stat_tasks)
+        errors.update(stat_errors)
+        views = {
+            item["id"]: int(item.get("statistics", {}).get("viewCount", 0))
+            for res in stats.values() for item in res.get("items", [])
+        }
+
+        now = time.time()
+        viewed_at = _iso(datetime.now(timezone.utc))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO uploads (channel_id, vid, published_at) "
+                "VALUES (?, ?, ?)",
+                new_uploads,
+            )
+            # 기본키 (channel_id, vid) 전체로 찾아야 테이블 전체 스캔을 하지 않는다
+            self._conn.executemany(
+                "UPDATE uploads SET view = ?, viewed_at = ? WHERE channel_id = ? AND vid = ?",
+                [(v, viewed_at, owner[vid], vid) for vid, v in views.items() if vid in owner],
+            )
+            # 조회에 실패한 채널은 다음 검색에서 다시 시도한다
+            self._conn.executemany(
+                "INSERT INTO channels VALUES (?, ?, ?) ON CONFLICT(channel_id) DO UPDATE "
+                "SET latest_published = COALESCE(excluded.latest_published, "
+                "latest_published), synced_at = excluded.synced_at",
+                [
+                    (cid, max((p for _, p in ups), default=None), now)
+                    for cid, ups in results.items()
+                ],
+            )
+            self._trim(list(results))
+            self._conn.commit()
+        return len(results), errors
+
+    def _growing(self, channel_ids):
+        """조회수를 다시 받을 저장된 업로드. 반환: [(vid, channel_id)]
+
+        최근 GROWING_DAYS 안에 올라왔거나, 조회수를 게시 후 MATURE_DAYS 전에 받은 업로드.
+        """
+        since = _iso(datetime.now(timezone.utc) - timedelta(days=GROWING_DAYS))
+        out = []
+        with self._lock:
+            for i in range(0, len(channel_ids), 500):
+                part = channel_ids[i: i + 500]
+                out.extend(self._conn.execute(
+                    "SELECT vid, channel_id FROM uploads "
+                    f"WHERE (published_at >= ? OR viewed_at IS NULL OR NOT {_MATURE_VIEW}) "
+                    f"AND channel_id IN ({','.join('?' * len(part))})",
+                    [since, *part],
+                ))
+        return out
+
+    def _trim(self, channel_ids):
+        """채널마다 최근 BASELINE_UPLOADS개만 남긴다 (락 안에서 호출)."""
+        for cid in channel_ids:
+            self._conn.execute(
+                "DELETE FROM uploads WHERE channel_id = ? AND vid NOT IN ("
+                "SELECT vid FROM uploads WHERE channel_id = ? "
+                "ORDER BY published_at DESC LIMIT ?)",
+                (cid, cid, BASELINE_UPLOADS),
+            )
+
+    # ---------------- 기준선 ----------------
+    def baselines(self, channel_ids) -> pd.DataFrame:
+        """채널별 기준선 (게시 후 MATURE_DAYS가 지나서 받은 조회수만, MIN_UPLOADS개 미만이면 제외).
+
+        반환 컬럼: channel_id, base_uploads, base_median, base_p75, base_p90
+        """
+        ids = list(dict.fromkeys(channel_ids))
+        until = _iso(datetime.now(timezone.utc) - timedelta(days=MATURE_DAYS))
+        frames = []
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i: i + 500]
+                frames.append(pd.read_sql_query(
+                    "SELECT channel_id, view FROM uploads WHERE view IS NOT NULL "
+                    f"AND published_at <= ? AND {_MATURE_VIEW} "
+                    f"AND channel_id IN ({','.join('?' * len(part))})",
+                    self._conn, params=[until, *part],
+                ))
+        columns = ["channel_id", "base_uploads", "base_median", "base_p75", "base_p90"]
+        if not frames or all(f.empty for f in frames):
+            return pd.DataFrame(columns=columns)
+        views = pd.concat(frames).groupby("channel_id")["view"]
+        out = pd.DataFrame({
+            "base_uploads": views.count(),
+            "base_median": views.median(),
+            "base_p75": views.quantile(0.75),
+            "base_p90": views.quantile(0.9),
+        }).reset_index()
+        return out[out["base_uploads"] >= MIN_UPLOADS][columns]
+
+    def counts(self) -> dict:
+        with self._lock:
+            channels = self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+            uploads = self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+        return {"channels": channels, "uploads": uploads}
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _playlist_call(youtube, channel_id, latest, trace):
+    """업로드 재생목록 첫 페이지에서 latest 이후 업로드만. 반환: [(video_id, published_at)]"""
+    def run():
+        started = time.perf_counter()
+        http = thread_http()
+        label = f"playlistItems[{channel_id}]"
+        res, io = measured_execute(youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=uploads_playlist_id(channel_id),
+            maxResults=BASELINE_UPLOADS,
+            fields=FIELDS["playlistItems"],
+        ), http)
+        trace.record_call("playlistItems", label, time.perf_counter() - started, **io)
+        uploads = []
+        for item in res.get("items", []):
+            details = item.get("contentDetails", {})
+            published = details.get("videoPublishedAt")
+            if not published:
+                continue  # 비공개/삭제된 업로드
+            if latest and published <= latest:
+                break     # 업로드 재생목록은 최신순이라 여기부터는 이미 저장됨
+            uploads.append((details["videoId"], published))
+        return uploads
+    return run
@@ -0,0 +1,135 @@
+"""채널/영상 엔티티 저장소 (엔티티별 조회 시각 기반 신선도, 델타 갱신)."""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from yt_cache import CACHE_DIR
+
+# 종류별 허용 나이(초): 이보다 오래된 엔티티는 다시 조회
+DEFAULT_MAX_AGE = {
+    "videos": 60 * 60,
+    "channels": 24 * 60 * 60,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    subscriber_count INTEGER,
+    video_count INTEGER,
+    view_count INTEGER,
+    fetched_at REAL NOT NULL,
+    item BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    channel_id TEXT,
+    title TEXT,
+    published_at TEXT,
+    view_count INTEGER,
+    like_count INTEGER,
+    comment_count INTEGER,
+    fetched_at REAL NOT NULL,
+    item BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel_id);
+"""
+
+
+def _int(v):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _channel_row(item, now):
+    stats = item.get("statistics", {})
+    return (
+        item["id"],
+        item.get("snippet", {}).get("title"),
+        _int(stats.get("subscriberCount")),
+        _int(stats.get("videoCount")),
+        _int(stats.get("viewCount")),
+        now,
+        zlib.compress(json.dumps(item, ensure_ascii=False).encode("utf-8")),
+    )
+
+
+def _video_row(item, now):
+    snippet = item.get("snippet", {})
+    stats = item.get("statistics", {})
+    return (
+        item["id"],
+        snippet.get("channelId"),
+        snippet.get("title"),
+        snippet.get("publishedAt"),
+        _int(stats.get("viewCount")),
+        _int(stats.get("likeCount")),
+        _int(stats.get("commentCount")),
+        now,
+        zlib.compress(json.dumps(item, ensure_ascii=False).encode("utf-8")),
+    )
+
+
+_ROW_BUILDERS = {"channels": _channel_row, "videos": _video_row}
+
+
+class EntityStore:
+    """채널/영상 API 항목을 ID 단위로 보관하는 스레드 안전한 SQLite 저장소.
+
+    검색마다 채널/영상을 처음부터 다시 조회하지 않고,
+    없거나 max_age보다 오래된 ID만 골라 API로 요청하기 위한 용도.
+    """
+
+    def __init__(self, path=None, max_age=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "entities.sqlite")
+        self.path = path
+        self.max_age = dict(DEFAULT_MAX_AGE, **(max_age or {}))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def lookup(self, kind: str, ids, max_age=None):
+        """저장된 신선한 항목과 다시 받아야 할 ID를 나눈다.
+
+        반환: ({id: item}, stale_or_missing_ids)
+        """
+        ids = list(dict.fromkeys(ids))
+        max_age = self.max_age[kind] if max_age is None else max_age
+        cutoff = time.time() - max_age
+        fresh = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                part = ids[i: i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, item FROM {kind} "
+                    f"WHERE fetched_at >= ? AND id IN ({','.join('?' * len(part))})",
+                    [cutoff, *part],
+                ).fetchall()
+                for eid, blob in rows:
+                    fresh[eid] = json.loads(zlib.decompress(blob))
+        return fresh, [i for i in ids if i not in fresh]
+
+    def put(self, kind: str, items):
+        now = time.time()
+        rows = [_ROW_BUILDERS[kind](item, now) for item in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {kind} VALUES ({','.join('?' * len(rows[0]))})",
+                rows,
+            )
+            self._conn.commit()
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
@@ -0,0 +1,225 @@
+"""여러 API 키를 하나의 서비스 객체처럼 쓰는 키 풀 (키별 쿼터 추적 / 소진 시 교체 / 재시도).
+
+get_client()가 돌려주는 서비스 객체와 같은 모양(pool.search().list(**params)
+.execute(http=...))이라 파이프라인·스냅샷 수집기에 그대로 넣을 수 있다.
+
+- 키마다 오늘 쓴 쿼터를 세고, 태평양 시간 자정(YouTube 쿼터 리셋)에 0으로 되돌린다
+- quotaExceeded가 오면 그 키를 오늘 하루 소진으로 표시하고 다음 키로 다시 보낸다
+- 일시적 오류(429/5xx/rateLimitExceeded/네트워크)는 지수 백오프 + 지터로 재시도
+  (재시도는 잡아 둔 쿼터를 되돌려 요청 하나당 한 번만 센다)
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from search_trace import QUOTA_COST
+from yt_client import get_client, thread_http
+
+# 키당 하루 기본 쿼터 (Google Cloud 프로젝트 기본값)
+DAILY_QUOTA = 10_000
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+_TRANSIENT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+_TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+class QuotaExhaustedError(RuntimeError):
+    """풀의 모든 키가 오늘 쿼터를 다 썼다."""
+
+
+class RateLimitedError(RuntimeError):
+    """재시도를 다 써도 일시적 오류(레이트 리밋/서버 오류)가 계속됐다."""
+
+
+def quota_day(now=None) -> str:
+    """쿼터 리셋 기준 날짜 (태평양 시간)."""
+    return (now or datetime.now(QUOTA_TZ)).astimezone(QUOTA_TZ).strftime("%Y-%m-%d")
+
+
+def error_reason(error: HttpError) -> str:
+    """HttpError 본문의 errors[0].reason (없으면 빈 문자열)."""
+    try:
+        body = json.loads(error.content.decode("utf-8"))
+        return body["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return ""
+
+
+def backoff_seconds(attempt: int) -> float:
+    """full jitter: 0 ~ min(BACKOFF_MAX, BACKOFF_BASE × 2^attempt) 사이 임의 대기."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class _Request:
+    def __init__(self, pool, endpoint, params):
+        self._pool = pool
+        self._endpoint = endpoint
+        self._params = params
+
+    def execute(self, http=None, num_retries=0):
+        return self._pool.execute(self._endpoint, self._params, http)
+
+
+class _Resource:
+    def __init__(self, pool, endpoint):
+        self._pool = pool
+        self._endpoint = endpoint
+
+    def list(self, **params):
+        return _Request(self._pool, self._endpoint, params)
+
+
+class KeyPool:
+    """API 키 풀. 남은 쿼터가 가장 많은 키부터 쓴다 (스레드 안전)."""
+
+    def __init__(self, keys, daily_quota=DAILY_QUOTA, max_retries=MAX_RETRIES,
+                 sleep=time.sleep):
+        self.keys = list(dict.fromkeys(k for k in keys if k))
+        if not self.keys:
+            raise ValueError("API 키가 없습니다.")
+        self.daily_quota = daily_quota
+        self.max_retries = max_retries
+        self.retries = 0
+        self.rotations = 0
+        self._sleep = sleep
+        self._day = quota_day()
+        self._used = {k: 0 for k in self.keys}
+        self._exhausted = set()
+        self._lock = threading.Lock()
+
+    # ---------------- 서비스 객체 흉내 ----------------
+    def search(self):
+        return _Resource(self, "search")
+
+    def videos(self):
+        return _Resource(self, "videos")
+
+    def channels(self):
+        return _Resource(self, "channels")
+
+    def playlistItems(self):
+        return _Resource(self, "playlistItems")
+
+    # ---------------- 키 선택 / 쿼터 ----------------
+    def _reset_if_new_day(self):
+        day = quota_day()
+        if day != self._day:
+            self._day = day
+            self._used = {k: 0 for k in self.keys}
+            self._exhausted.clear()
+
+    def _acquire(self, cost: int) -> str:
+        """비용을 감당할 수 있는 키 중 남은 쿼터가 가장 많은 키를 골라 비용을 미리 잡는다."""
+        with self._lock:
+            self._reset_if_new_day()
+            candidates = [
+                k for k in self.keys
+                if k not in self._exhausted and self._used[k] + cost <= self.daily_quota
+            ]
+            if not candidates:
+                raise QuotaExhaustedError(
+                    f"API 키 {len(self.keys)}개의 오늘 쿼터를 모두 사용했습니다 "
+                    f"(태평양 시간 자정에 초기화)."
+                )
+            key = min(candidates, key=self._used.get)
+            self._used[key] += cost
+            return key
+
+    def _release(self, key: str, cost: int):
+        """실패해서 다시 보낼 요청에 미리 잡아 둔 비용을 돌려준다."""
+        with self._lock:
+            self._used[key] = max(0, self._used[key] - cost)
+
+    def _mark_exhausted(self, key: str):
+        with self._lock:
+            self._exhausted.add(key)
+            self._used[key] = self.daily_quota
+            self.rotations += 1
+
+    def execute(self, endpoint, params, http=None):
+        """요청 실행. 쿼터 소진 키는 건너뛰고, 일시적 오류는 백오프 후 재시도."""
+        cost = QUOTA_COST.get(endpoint, 1)
+        attempt = 0
+        while True:
+            key = self._acquire(cost)
+            request = getattr(get_client(key), endpoint)().list(**params)
+            try:
+                return request.execute(http=http or thread_http())
+            except HttpError as e:
+                reason = error_reason(e)
+                if reason in _QUOTA_REASONS:
+                    # 같은 요청을 다른 키로 바로 다시 보낸다 (재시도 횟수와 별개)
+                    self._mark_exhausted(key)
+                    continue
+                if (e.resp.status not in _TRANSIENT_STATUS
+                        and reason not in _TRANSIENT_REASONS):
+                    raise
+                error = e
+            except (OSError, httplib2.ServerNotFoundError) as e:
+                # 타임아웃 / 연결 끊김 (httplib2는 socket 예외를 그대로 올린다) / DNS 실패
+                error = e
+            self._release(key, cost)
+            if attempt >= self.max_retries:
+                raise RateLimitedError(
+                    f"{endpoint} 요청이 {attempt + 1}회 연속 실패했습니다: {error}"
+                ) from error
+            with self._lock:
+                self.retries += 1
+            self._sleep(backoff_seconds(attempt))
+            attempt += 1
+
+    def stats(self) -> dict:
+        """키별 오늘 사용량 (키는 끝 4자리만)."""
+        with self._lock:
+            self._reset_if_new_day()
+            return {
+                "day": self._day,
+                "keys": [
+                    {
+                        "key": f"…{k[-4:]}",
+                        "used": self._used[k],
+                        "exhausted": k in self._exhausted,
+                    }
+                    for k in self.keys
+                ],
+                "remaining": sum(
+                    0 if k in self._exhausted else max(0, self.daily_quota - self._used[k])
+                    for k in self.keys
+                ),
+                "retries": self.retries,
+                "rotations": self.rotations,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(keys) -> KeyPool:
+    """같은 키 목록이면 프로세스 전역으로 같은 풀을 돌려준다 (세션 간 쿼터 공유)."""
+    keys = tuple(dict.fromkeys(k for k in keys if k))
+    with _pools_lock:
+        pool = _pools.get(keys)
+        if pool is None:
+            pool = _pools[keys] = KeyPool(keys)
+        return pool
+
+
+def parse_keys(value) -> list:
+    """secrets/환경변수 값 → 키 목록. 리스트 또는 콤마/줄바꿈 구분 문자열."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace("\n", ",").split(",")
+    return [k.strip() for k in value if k and k.strip()]
@@ -0,0 +1,165 @@
+"""누적 검색 결과 로컬 전문 검색 인덱스 (SQLite FTS5: 제목/채널/카테고리/자막)."""
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from yt_cache import CACHE_DIR
+
+# 점수 계산(scoring.score)에 다시 넣을 수 있는 정규화 컬럼만 저장한다
+_COLUMNS = [
+    "vid", "title", "channel", "channel_id", "published_at", "category_id",
+    "view", "like", "comment", "duration_iso", "thumbnail", "subs", "video_count",
+    "thumbnail_small",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    vid TEXT PRIMARY KEY,
+    title TEXT,
+    channel TEXT,
+    channel_id TEXT,
+    published_at TEXT,
+    category_id TEXT,
+    view INTEGER,
+    like INTEGER,
+    comment INTEGER,
+    duration_iso TEXT,
+    thumbnail TEXT,
+    subs INTEGER,
+    video_count INTEGER,
+    thumbnail_small TEXT,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published_at);
+CREATE INDEX IF NOT EXISTS idx_videos_subs ON videos(subs);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    vid UNINDEXED, title, channel, category, transcript,
+    tokenize = 'unicode61', prefix = '2 3'
+);
+"""
+
+
+def match_expr(query: str) -> str:
+    """사용자 키워드 → FTS5 MATCH 식. 단어마다 접두어 검색, 모두 포함(AND).
+
+    한국어 조사가 붙은 단어(예: 먹방을)도 잡히도록 접두어(*)로 찾는다.
+    """
+    tokens = [t.replace('"', '""') for t in query.split()]
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+class LocalIndex:
+    """검색할 때마다 결과를 쌓아두고, 쿼터 없이 키워드로 다시 찾는 로컬 인덱스."""
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "local_index.sqlite")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(videos)")}
+        if "thumbnail_small" not in columns:
+            # 이전 버전 인덱스: 비어 있으면 to_compact가 원본 썸네일로 대신한다
+            self._conn.execute("ALTER TABLE videos ADD COLUMN thumbnail_small TEXT")
+        self._conn.commit()
+
+    def add(self, df: pd.DataFrame, category_names: dict):
+        """normalize_items/score 결과를 인덱스에 upsert (자막은 유지)."""
+        if df.empty:
+            return
+        rows = df[_COLUMNS].astype(object).where(df[_COLUMNS].notna(), None)
+        now = time.time()
+        records = [(*r, now) for r in rows.itertuples(index=False, name=None)]
+        categories = df["category_id"].map(category_names).fillna("기타").tolist()
+        cols = ", ".join(_COLUMNS)
+        updates = ", ".join(
+            f"{c} = excluded.{c}" for c in [*_COLUMNS[1:], "indexed_at"]
+        )
+        with self._lock:
+            # UPSERT라 videos.rowid가 유지되고, FTS 문서는 같은 rowid로 맞춘다
+            self._conn.executemany(
+                f"INSERT INTO videos ({cols}, indexed_at) "
+                f"VALUES ({','.join('?' * (len(_COLUMNS) + 1))}) "
+                f"ON CONFLICT(vid) DO UPDATE SET {updates}",
+                records,
+            )
+            vids = df["vid"].tolist()
+            rowids, transcripts = {}, {}
+            for i in range(0, len(vids), 500):
+                part = vids[i: i + 500]
+                rowids.update(self._conn.execute(
+                    "SELECT vid, rowid FROM videos "
+                    f"WHERE vid IN ({','.join('?' * len(part))})",
+                    part,
+                ))
+            ids = list(rowids.values())
+            for i in range(0, len(ids), 500):
+                part = ids[i: i + 500]
+                transcripts.update(self._conn.execute(
+                    "SELECT rowid, transcript FROM videos_fts "
+                    f"WHERE rowid IN ({','.join('?' * len(part))})",
+                    part,
+                ))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO videos_fts (rowid, vid, title, channel, "
+                "category, transcript) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (rowids[vid], vid, title, channel, cat,
+                     transcripts.get(rowids[vid]))
+                    for (vid, title, channel), cat in zip(
+                        df[["vid", "title", "channel"]].itertuples(index=False, name=None),
+                        categories,
+                    )
+                ],
+            )
+            self._conn.commit()
+
+    def add_transcript(self, video_id: str, text: str):
+        """자막이 준비되면 해당 영상 문서에 자막 텍스트를 붙인다 (인덱스에 있는 영상만)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE videos_fts SET transcript = ? "
+                "WHERE rowid = (SELECT rowid FROM videos WHERE vid = ?)",
+                (text, video_id),
+            )
+            self._conn.commit()
+
+    def search(self, query: str, published_after=None, subs_range=None,
+               category=None, limit=2_000) -> pd.DataFrame:
+        """키워드로 인덱스 검색. 기간/구독자 범위/카테고리 ID는 SQL에서 먼저 거른다.
+
+        반환: normalize_items와 같은 컬럼의 DataFrame (score()에 그대로 넣을 수 있음).
+        검색어가 비어 있으면 (FTS5가 빈 MATCH 식을 문법 오류로 보므로) 빈 DataFrame.
+        """
+        expr = match_expr(query or "")
+        if not expr:
+            return pd.DataFrame(columns=[*_COLUMNS, "raw_date"])
+        where, params = ["videos_fts MATCH ?"], [expr]
+        if published_after:
+            where.append("v.published_at >= ?")
+            params.append(published_after)
+        if subs_range:
+            where.append("v.subs BETWEEN ? AND ?")
+            params.extend(subs_range)
+        if category:
+            where.append("v.category_id = ?")
+            params.append(category)
+        sql = (
+            f"SELECT {', '.join('v.' + c for c in _COLUMNS)} "
+            "FROM videos_fts JOIN videos v ON v.rowid = videos_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY bm25(videos_fts) LIMIT ?"
+        )
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=[*params, limit])
+        df["raw_date"] = pd.to_datetime(df["published_at"].str[:10], errors="coerce")
+        return df
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
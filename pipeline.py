@@ -0,0 +1,326 @@
+"""검색 → videos/channels 조회 → 점수 계산 파이프라인 (Streamlit 없이도 사용 가능)."""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from api_fields import FIELDS
+from scoring import (
+    GRADES,
+    apply_baseline,
+    filter_mask,
+    keyword_stats,
+    normalize_items,
+    score,
+    to_compact,
+)
+from search_trace import SearchTrace
+from yt_fetch import collect, collect_keywords, collect_trending, deep_collect
+
+# -------------------------------------------------------------------------
+# ⭐ [데이터 정의]
+# -------------------------------------------------------------------------
+CATEGORY_MAP = {
+    "전체": None, "영화/애니": "1", "자동차": "2", "음악": "10",
+    "동물": "15", "스포츠": "17", "여행/이벤트": "19", "게임": "20",
+    "브이로그/인물": "22", "코미디": "23", "엔터테인먼트": "24",
+    "뉴스/정치": "25", "하우투/스타일": "26", "교육": "27", "과학/기술": "28"
+}
+region_map = {"🔵한국": "KR", "🔴일본": "JP", "🟢미국": "US", "🌏전체": None}
+
+# 카테고리 ID → 한글 이름 매핑
+CATEGORY_NAME_BY_ID = {v: k for k, v in CATEGORY_MAP.items() if v is not None}
+
+# 기간 → 일수 (None = 전체)
+PERIOD_DAYS = {"1주일": 7, "1개월": 30, "3개월": 90, "전체": None}
+
+# 길이 구분 (초) — search의 videoDuration(short < 4분, long > 20분)과 같은 기준
+DURATION_RANGES = {"쇼츠": (0, 4 * 60), "롱폼": (20 * 60, float("inf"))}
+
+
+def published_after_for(days_filter: str, now: datetime):
+    """기간 선택값 → publishedAfter (RFC 3339). 전체면 None."""
+    days = PERIOD_DAYS[days_filter]
+    if days is None:
+        return None
+    return (now - timedelta(days=days)).isoformat("T") + "Z"
+
+
+def api_duration_for(durations) -> str:
+    """["쇼츠"] / ["롱폼"] / 둘 다 → videoDuration 파라미터."""
+    if len(durations) == 1:
+        return "short" if "쇼츠" in durations else "long"
+    return "any"
+
+
+def regions_for(country_options):
+    """국가 pills 선택값 → regionCode 목록 (None = 지역 제한 없음)."""
+    regions = [region_map[c] for c in country_options if c != "🌏전체"]
+    if "🌏전체" in country_options:
+        regions.append(None)
+    return regions or [None]
+
+
+def trending_regions(regions):
+    """트렌딩 차트용 지역 코드. 차트는 지역이 꼭 필요해 "전체"(None)는 region_map 전체로 편다."""
+    codes = [r for r in regions if r]
+    if None in regions or not codes:
+        codes += [r for r in region_map.values() if r and r not in codes]
+    return codes
+
+
+def period_duration_mask(df, days_filter, durations, now) -> pd.Series:
+    """search 파라미터(publishedAfter / videoDuration)를 로컬에서 같은 기준으로 적용."""
+    mask = pd.Series(True, index=df.index)
+    days = PERIOD_DAYS[days_filter]
+    if days is not None:
+        mask &= df["raw_date"] >= pd.Timestamp(now - timedelta(days=days)).normalize()
+    if len(durations) == 1:
+        lo, hi = DURATION_RANGES[durations[0]]
+        mask &= df["duration_sec"].between(lo, hi, inclusive="left")
+    return mask
+
+
+def search_params(query, regions, max_results, days_filter, durations, now,
+                  category=None):
+    """search().list 기본 파라미터 (지역 코드 / pageToken 제외).
+
+    category(CATEGORY_MAP의 ID)는 videoCategoryId로 넘겨 서버에서 거른다.
+    """
+    params = {
+        "part": "snippet",
+        "q": query,
+        "maxResults": min(50, max(10, int(max_results / len(regions)))),
+        "order": "viewCount",
+        "type": "video",
+        "videoDuration": api_duration_for(durations),
+        "fields": FIELDS["search"],
+    }
+    published_after = published_after_for(days_filter, now)
+    if published_after:
+        params["publishedAfter"] = published_after
+    if category:
+        params["videoCategoryId"] = category
+    return params
+
+
+def run_search(youtube, cache, query, *, regions=(None,), max_results=30,
+               days_filter="1개월", durations=("쇼츠",), grades=GRADES,
+               subs_range=(0, 1_000_000), deep=False, deep_target=500,
+               quota_budget=2_000, store=None, trace=None, on_progress=None,
+               snapshots=None, index=None, on_partial=None, category=None,
+               baselines=None, now=None):
+    """키워드 하나를 검색하고 점수를 매긴다.
+
+    반환: (display, scored, errors)
+    - display: 정렬된 수치 전용 결과 (to_compact, 검색 결과가 0건이면 None).
+      표시 문자열은 렌더 시점에 scoring.format_display로 만든다
+    - scored: 필터 적용 후의 원본 수치 컬럼 DataFrame
+    - errors: {요청 label: 에러 메시지} (실패한 요청만, 나머지 결과는 유지)
+
+    snapshots(SnapshotStore)를 주면 결과 영상을 추적 목록에 올리고,
+    쌓인 스냅샷이 있으면 최근 1시간/24시간 조회수 증가량을 붙인다.
+    index(LocalIndex)를 주면 필터 적용 전 결과 전체를 로컬 인덱스에 쌓는다.
+    on_partial(display)을 주면 수집 도중에도 지금까지 모인 영상으로 점수를 매겨
+    (스냅샷 증가량 없이) 부분 결과를 넘긴다.
+
+    구독자 범위는 채널 조회 직후 먼저 적용해 범위 밖 영상은 videos().list를
+    부르지 않고, category(카테고리 ID)는 검색 단계에서 서버가 거른다.
+    baselines(ChannelBaselines)를 주면 등급을 채널 기준선 대비 배수로 매긴다
+    (구독자 범위 안 채널만 동기화, 부분 결과는 구독자 기준 그대로).
+    """
+    # 시 단위로 맞춰 같은 조건의 검색이 캐시 키를 공유하도록 한다
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    regions = list(regions)
+    params = search_params(
+        query, regions, max_results, days_filter, durations, now, category
+    )
+
+    if trace is None:
+        trace = SearchTrace(query)
+    trace.params = dict(params, regions=regions, deep=deep)
+
+    partial = None
+    if on_partial is not None:
+        def partial(video_items, channel_items):
+            scored = score(normalize_items(video_items, channel_items), now)
+            scored = scored[filter_mask(scored, grades, subs_range)]
+            on_partial(to_compact(scored, CATEGORY_NAME_BY_ID))
+
+    # 지역별 검색 / videos·channels 청크는 병렬 호출
+    with trace.phase("fetch"):
+        if deep:
+            video_items, channel_items, errors, _ = deep_collect(
+                youtube, cache, params, regions,
+                target=deep_target, quota_budget=quota_budget,
+                on_progress=on_progress, store=store, trace=trace,
+                on_partial=partial, subs_range=subs_range,
+            )
+        else:
+            video_items, channel_items, errors, _ = collect(
+                youtube, cache, params, regions, store=store, trace=trace,
+                on_partial=partial, subs_range=subs_range,
+            )
+
+    if not video_items:
+        return None, None, errors
+
+    # 컬럼 단위 정규화 → 점수 계산 → 마스크 필터
+    with trace.phase("scoring"):
+        scored = score(normalize_items(video_items, channel_items), now)
+    if index is not None:
+        with trace.phase("index"):
+            index.add(scored, CATEGORY_NAME_BY_ID)
+    if baselines is not None:
+        scored = _with_baselines(scored, baselines, youtube, subs_range, trace, errors)
+    scored = scored[filter_mask(scored, grades, subs_range)]
+    return _finish(scored, trace, errors, snapshots)
+
+
+def run_compare(youtube, cache, queries, *, regions=(None,), max_results=30,
+                days_filter="1개월", durations=("쇼츠",), grades=GRADES,
+                subs_range=(0, 1_000_000), store=None, trace=None, snapshots=None,
+                index=None, category=None, baselines=None, now=None):
+    """여러 키워드를 함께 검색해 비교한다 (videos/channels는 키워드 간 공유).
+
+    반환: (display, scored, stats, errors)
+    - display / scored: 영상×키워드 한 행씩, keyword 컬럼 포함 (0건이면 None)
+    - stats: 키워드별 영상 수 / 중앙 성과도 / 중앙 조회수 / 등급 분포 (필터 적용 전)
+    """
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    regions = list(regions)
+    queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+    params_by_keyword = {
+        q: search_params(q, regions, max_results, days_filter, durations, now, category)
+        for q in queries
+    }
+
+    if trace is None:
+        trace = SearchTrace(", ".join(queries))
+    trace.params = dict(next(iter(params_by_keyword.values()), {}),
+                        q=queries, regions=regions)
+
+    with trace.phase("fetch"):
+        video_items, channel_items, keyword_vids, errors, _ = collect_keywords(
+            youtube, cache, params_by_keyword, regions, store=store, trace=trace,
+            subs_range=subs_range,
+        )
+
+    if not video_items:
+        return None, None, None, errors
+
+    with trace.phase("scoring"):
+        scored = score(normalize_items(video_items, channel_items), now)
+    if index is not None:
+        with trace.phase("index"):
+            index.add(scored, CATEGORY_NAME_BY_ID)
+    if baselines is not None:
+        scored = _with_baselines(scored, baselines, youtube, subs_range, trace, errors)
+    with trace.phase("scoring"):
+        pairs = pd.DataFrame(
+            [(k, v) for k, vids in keyword_vids.items() for v in vids],
+            columns=["keyword", "vid"],
+        )
+        tagged = pairs.merge(scored, on="vid")
+        stats = keyword_stats(tagged, queries)
+    tagged = tagged[filter_mask(tagged, grades, subs_range)]
+    display, tagged, errors = _finish(tagged, trace, errors, snapshots)
+    return display, tagged, stats, errors
+
+
+def run_trending(youtube, cache, *, regions=(None,), categories=None, max_pages=1,
+                 days_filter="전체", durations=("쇼츠", "롱폼"), grades=GRADES,
+                 subs_range=(0, 1_000_000), store=None, trace=None, snapshots=None,
+                 index=None, baselines=None, now=None):
+    """키워드 없이 지역×카테고리 인기 차트를 훑는다 (search 없이 페이지당 1 유닛).
+
+    categories(카테고리 ID 목록, None = CATEGORY_MAP 전체 + 전체 차트)마다
+    max_pages × 50개까지. 기간/길이는 서버 필터가 없어 점수 계산 후 로컬에서 거른다.
+    반환 형식은 run_search와 같다.
+    """
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    regions = trending_regions(list(regions))
+    if categories is None:
+        categories = list(CATEGORY_MAP.values())
+
+    if trace is None:
+        trace = SearchTrace("🔥 트렌딩")
+    trace.params = {"chart": "mostPopular", "regions": regions,
+                    "categories": list(categories), "max_pages": max_pages}
+
+    with trace.phase("fetch"):
+        video_items, channel_items, errors, _ = collect_trending(
+            youtube, cache, regions, categories, max_pages, store=store, trace=trace,
+        )
+
+    if errors:
+        # 지역×카테고리 요청이 많아 요청마다 경고를 띄우지 않고 한 줄로
+        label, error = next(iter(errors.items()))
+        errors = {"트렌딩 수집": f"{len(errors)}건 (예: {label} {error})"}
+    if not video_items:
+        return None, None, errors
+
+    with trace.phase("scoring"):
+        scored = score(normalize_items(video_items, channel_items), now)
+    if index is not None:
+        with trace.phase("index"):
+            index.add(scored, CATEGORY_NAME_BY_ID)
+    if baselines is not None:
+        scored = _with_baselines(scored, baselines, youtube, subs_range, trace, errors)
+    scored = scored[
+        filter_mask(scored, grades, subs_range)
+        & period_duration_mask(scored, days_filter, durations, now)
+    ]
+    return _finish(scored, trace, errors, snapshots)
+
+
+def run_local_search(index, query, *, days_filter="1개월", grades=GRADES,
+                     subs_range=(0, 1_000_000), trace=None, snapshots=None,
+                     category=None, baselines=None, now=None):
+    """API 호출 없이(쿼터 0) 로컬 인덱스에서 검색. 반환 형식은 run_search와 같다.
+
+    baselines를 주면 이미 동기화된 채널 기준선만 쓴다 (동기화 호출 없음).
+    """
+    now = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    if trace is None:
+        trace = SearchTrace(query)
+    trace.params = {"q": query, "local": True, "days_filter": days_filter}
+
+    with trace.phase("local"):
+        found = index.search(
+            query,
+            published_after=published_after_for(days_filter, now),
+            subs_range=subs_range,
+            category=category,
+        )
+    if found.empty:
+        return None, None, {}
+    with trace.phase("scoring"):
+        scored = score(found, now)
+    if baselines is not None:
+        scored = _with_baselines(scored, baselines, None, subs_range, trace, {})
+    scored = scored[filter_mask(scored, grades, subs_range)]
+    return _finish(scored, trace, {}, snapshots)
+
+
+def _with_baselines(scored, baselines, youtube, subs_range, trace, errors):
+    """구독자 범위 안 채널의 기준선을 (youtube가 있으면 증분 동기화 후) 붙여 등급을 다시 매긴다."""
+    with trace.phase("baseline"):
+        channel_ids = scored.loc[scored["subs"].between(*subs_range), "channel_id"].unique()
+        if youtube is not None:
+            _, sync_errors = baselines.sync(youtube, channel_ids, trace)
+            if sync_errors:
+                # 채널마다 경고를 띄우지 않고 한 줄로 (해당 채널은 구독자 기준 등급 유지)
+                errors["baseline"] = f"채널 기준선 동기화 {len(sync_errors)}건 실패"
+        return apply_baseline(scored, baselines.baselines(channel_ids))
+
+
+def _finish(scored, trace, errors, snapshots):
+    """스냅샷 증가량을 붙이고 공유용 압축 결과 프레임을 만든다 (API/로컬 검색 공통)."""
+    if snapshots is not None and not scored.empty:
+        with trace.phase("snapshots"):
+            snapshots.track(scored["vid"])
+            scored = scored.merge(snapshots.deltas(scored["vid"]), on="vid", how="left")
+    with trace.phase("dataframe"):
+        display = to_compact(scored, CATEGORY_NAME_BY_ID)
+    trace.result_rows = len(display)
+    return display, scored, errors
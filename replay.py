@@ -0,0 +1,328 @@
+"""오프라인 YouTube API 대역 (응답 녹화/재생 + 합성 데이터 생성기).
+
+실제 서비스 객체와 같은 모양(youtube.search().list(**params).execute(http=...))이라
+파이프라인 코드에 그대로 넣을 수 있다.
+
+예) 실제 호출을 녹화:
+    rec = RecordingClient(get_client(api_key))
+    run_search(rec, cache, "키워드", ...)
+    rec.save("fixtures/keyword.json.gz")
+"""
+import gzip
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from api_fields import project
+from yt_cache import normalize_params
+
+ENDPOINTS = ("search", "videos", "channels", "playlistItems")
+
+
+class _Request:
+    def __init__(self, fn, params):
+        self._fn = fn
+        self._params = params
+
+    def execute(self, http=None, num_retries=0):
+        response = self._fn(self._params)
+        if http is None:
+            return response
+        # 실제 클라이언트처럼 본문을 JSON으로 주고받아 송수신 크기 / 파싱 시간을 남긴다
+        body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        http.last_bytes = len(body)
+        http.last_bytes_out = len(urlencode(self._params))
+        started = time.perf_counter()
+        response = json.loads(body)
+        http.last_parse_seconds = time.perf_counter() - started
+        return response
+
+
+class _Resource:
+    def __init__(self, client, endpoint):
+        self._client = client
+        self._endpoint = endpoint
+
+    def list(self, **params):
+        return _Request(lambda p: self._client.respond(self._endpoint, p), params)
+
+
+class _FakeService:
+    """search()/videos()/channels()/playlistItems()를 respond(endpoint, params)로 연결하는 공통 뼈대."""
+
+    latency = 0.0
+
+    def search(self):
+        return _Resource(self, "search")
+
+    def videos(self):
+        return _Resource(self, "videos")
+
+    def channels(self):
+        return _Resource(self, "channels")
+
+    def playlistItems(self):
+        return _Resource(self, "playlistItems")
+
+    def respond(self, endpoint, params):
+        raise NotImplementedError
+
+
+# -------------------------------------------------------------------------
+# 녹화 / 재생
+# -------------------------------------------------------------------------
+class RecordingClient(_FakeService):
+    """실제 서비스 객체를 감싸 응답을 정규화된 파라미터 키로 기록."""
+
+    def __init__(self, youtube):
+        self._youtube = youtube
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.searches = []
+
+    def respond(self, endpoint, params):
+        res = getattr(self._youtube, endpoint)().list(**params).execute()
+        with self._lock:
+            self.responses[normalize_params(endpoint, params)] = res
+            if endpoint == "search":
+                self.searches.append(params)
+        return res
+
+    def save(self, path):
+        with self._lock:
+            save_fixture(path, self.responses, self.searches)
+
+
+class ReplayClient(_FakeService):
+    """녹화된 응답을 재생. 없는 요청은 KeyError (오프라인에서 실수로 호출 방지).
+
+    latency(초)를 주면 호출마다 그만큼 기다려 네트워크 지연을 흉내낸다.
+    """
+
+    def __init__(self, responses, latency=0.0, searches=()):
+        self.responses = responses
+        self.searches = list(searches)
+        self.latency = latency
+        self.calls = {e: 0 for e in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, latency=0.0):
+        fixture = load_fixture(path)
+        return cls(fixture["responses"], latency, fixture["searches"])
+
+    def respond(self, endpoint, params):
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = normalize_params(endpoint, params)
+        if key not in self.responses:
+            raise KeyError(f"녹화되지 않은 요청: {key[:120]}")
+        return self.responses[key]
+
+
+def save_fixture(path, responses: dict, searches=()):
+    """{"searches": [녹화 순서대로 search 파라미터], "responses": {캐시 키: 응답}}"""
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"searches": list(searches), "responses": responses}, f,
+                  ensure_ascii=False)
+
+
+def load_fixture(path) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------------------------------------------------------------
+# 합성 데이터
+# -------------------------------------------------------------------------
+class SyntheticClient(_FakeService):
+    """n_videos개 영상 / n_channels개 채널로 이루어진 결정적(seed 고정) 가짜 YouTube.
+
+    - search: 검색어와 무관하게 같은 영상 풀을 50개씩 페이지로 (nextPageToken 포함)
+    - videos/channels: 요청한 ID에 대한 실제와 같은 모양의 항목
+    - videos(chart="mostPopular"): 카테고리/지역으로 거른 영상을 조회수 순으로 50개씩
+      (풀에 없는 카테고리는 실제처럼 404 videoChartNotFound)
+    - playlistItems: 채널 업로드 재생목록(UU...)을 최신순으로
+    - fields 파라미터가 있으면 실제 API처럼 응답을 그 마스크로 자른다
+    """
+
+    def __init__(self, n_videos, n_channels=None, seed=0, latency=0.0,
+                 now=None):
+        self.n_videos = n_videos
+        self.n_channels = n_channels or max(1, n_videos // 5)
+        self.latency = latency
+        self.calls = {e: 0 for e in ENDPOINTS}
+        self._lock = threading.Lock()
+        self._now = now or datetime(2025, 1, 1)
+        rng = random.Random(seed)
+        self._video_channel = [rng.randrange(self.n_channels) for _ in range(n_videos)]
+        self._views = [int(rng.lognormvariate(9, 2)) for _ in range(n_videos)]
+        self._age_days = [rng.randint(0, 120) for _ in range(n_videos)]
+        self._duration = [rng.choice([15, 42, 59, 305, 1260, 4000]) for _ in range(n_videos)]
+        self._category = [rng.choice(["1", "10", "20", "22", "24", "27", "28"])
+                          for _ in range(n_videos)]
+        self._subs = [int(rng.lognormvariate(8, 2.5)) for _ in range(self.n_channels)]
+
+    def respond(self, endpoint, params):
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        response = getattr(self, f"_{endpoint}")(params)
+        return project(response, params["fields"]) if "fields" in params else response
+
+    def _search(self, params):
+        size = int(params.get("maxResults", 5))
+        page = int(params.get("pageToken") or 0)
+        start = page * size
+        stop = min(start + size, self.n_videos)
+        res = {
+            "kind": "youtube#searchListResponse",
+            "pageInfo": {"totalResults": self.n_videos, "resultsPerPage": size},
+            "items": [
+                {
+                    "kind": "youtube#searchResult",
+                    "id": {"kind": "youtube#video", "videoId": _vid(i)},
+                    "snippet": self._snippet(i),
+                }
+                for i in range(start, stop)
+            ],
+        }
+        if stop < self.n_videos:
+            res["nextPageToken"] = str(page + 1)
+        return res
+
+    def _videos(self, params):
+        if params.get("chart"):
+            return self._chart(params)
+        ids = [int(v[1:]) for v in params["id"].split(",")]
+        return {"kind": "youtube#videoListResponse",
+                "items": [self._video(i) for i in ids if i < self.n_videos]}
+
+    def _chart(self, params):
+        category = params.get("videoCategoryId")
+        if category is not None and category not in self._category:
+            # 실제 API처럼 제공하지 않는 카테고리 차트는 404 videoChartNotFound
+            raise _http_error(404, "videoChartNotFound",
+                              "The requested video chart is not supported or is not available.")
+        # 지역마다 풀의 2/3 정도만 차트에 오르도록 (지역 간 일부 겹침)
+        salt = sum(map(ord, params.get("regionCode", "")))
+        pool = sorted(
+            (i for i in range(self.n_videos)
+             if (category is None or self._category[i] == category)
+             and (i + salt) % 3),
+            key=lambda i: -self._views[i],
+        )
+        size = int(params.get("maxResults", 5))
+        page = int(params.get("pageToken") or 0)
+        res = {
+            "kind": "youtube#videoListResponse",
+            "pageInfo": {"totalResults": len(pool), "resultsPerPage": size},
+            "items": [self._video(i) for i in pool[page * size:(page + 1) * size]],
+        }
+        if (page + 1) * size < len(pool):
+            res["nextPageToken"] = str(page + 1)
+        return res
+
+    def _video(self, i):
+        views = self._views[i]
+        return {
+            "kind": "youtube#video",
+            "id": _vid(i),
+            "snippet": dict(self._snippet(i), categoryId=self._category[i]),
+            "statistics": {
+                "viewCount": str(views),
+                "likeCount": str(views // 40),
+                "commentCount": str(views // 900),
+            },
+            "contentDetails": {"duration": _iso_duration(self._duration[i])},
+        }
+
+    def _playlistItems(self, params):
+        c = int(params["playlistId"][2:])
+        uploads = sorted(
+            (i for i in range(self.n_videos) if self._video_channel[i] == c),
+            key=lambda i: self._age_days[i],
+        )[:int(params.get("maxResults", 5))]
+        return {
+            "kind": "youtube#playlistItemListResponse",
+            "items": [
+                {
+                    "kind": "youtube#playlistItem",
+                    "contentDetails": {
+                        "videoId": _vid(i),
+                        "videoPublishedAt": self._snippet(i)["publishedAt"],
+                    },
+                }
+                for i in uploads
+            ],
+        }
+
+    def _channels(self, params):
+        items = []
+        for channel_id in params["id"].split(","):
+            c = int(channel_id[2:])
+            if c >= self.n_channels:
+                continue
+            items.append({
+                "kind": "youtube#channel",
+                "id": channel_id,
+                "statistics": {
+                    "subscriberCount": str(self._subs[c]),
+                    "videoCount": str(10 + c % 500),
+                    "viewCount": str(self._subs[c] * 120),
+                },
+            })
+        return {"kind": "youtube#channelListResponse", "items": items}
+
+    def _snippet(self, i):
+        c = self._video_channel[i]
+        published = self._now - timedelta(days=self._age_days[i])
+        thumbs = {
+            tier: {"url": f"https://i.ytimg.com/vi/{_vid(i)}/{name}.jpg",
+                   "width": w, "height": h}
+            for tier, name, w, h in (
+                ("default", "default", 120, 90),
+                ("medium", "mqdefault", 320, 180),
+                ("high", "hqdefault", 480, 360),
+            )
+        }
+        return {
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "channelId": _cid(c),
+            "title": f"합성 영상 {i} #{self._category[i]}",
+            "description": "설명 " * 20,
+            "thumbnails": thumbs,
+            "channelTitle": f"채널 {c}",
+            "liveBroadcastContent": "none",
+        }
+
+
+def _http_error(status, reason, message):
+    content = json.dumps({"error": {
+        "code": status, "message": message,
+        "errors": [{"reason": reason, "message": message}],
+    }}).encode("utf-8")
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+def _vid(i):
+    return f"v{i:07d}"
+
+
+def _cid(c):
+    return f"UC{c:06d}"
+
+
+def _iso_duration(sec):
+    h, rem = divmod(sec, 3600)
+    m, s = divmod(rem, 60)
+    return "PT" + (f"{h}H" if h else "") + (f"{m}M" if m else "") + f"{s}S"
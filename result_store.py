@@ -0,0 +1,90 @@
+"""검색 결과 프레임 공유 저장소 (프로세스 전역, 크기 제한 LRU).
+
+같은 조건의 검색은 세션이 몇 개든 프레임 하나를 같이 참조한다.
+세션에는 저장소가 돌려준 객체의 참조만 두고, 절대 제자리에서 수정하지 않는다.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 응답 캐시의 search TTL(30분)보다 짧게: 공유 결과가 캐시보다 오래 살지 않도록
+DEFAULT_TTL = 10 * 60
+
+
+def result_key(**params) -> str:
+    """검색 조건 → 저장소 키. 리스트/튜플은 순서를 유지한 JSON으로."""
+    return json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def frame_bytes(value) -> int:
+    """DataFrame(또는 DataFrame 튜플)의 메모리 사용량."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(frame_bytes(v) for v in value)
+    return 0
+
+
+class ResultStore:
+    """스레드 안전한 in-memory LRU. 항목 수 / 전체 바이트 / TTL 중 하나라도 넘으면 제거."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created, nbytes, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, value):
+        """저장 후 같은 값을 반환. 한도를 넘는 단일 항목은 저장하지 않는다."""
+        nbytes = frame_bytes(value)
+        if nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time(), nbytes, value)
+            self._bytes += nbytes
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+        return value
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
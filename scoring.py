@@ -0,0 +1,246 @@
+"""API 응답 → 컬럼형 DataFrame 정규화 및 벡터화된 성과도/등급 계산."""
+import numpy as np
+import pandas as pd
+
+# 성과도(%) 기준 등급 (높은 순)
+GRADE_BINS = [
+    (1000, "🚀 떡상중"),
+    (300, "📈 급상승"),
+    (100, "👀 주목"),
+]
+GRADE_DEFAULT = "💤 일반"
+GRADES = [g for _, g in GRADE_BINS] + [GRADE_DEFAULT]
+
+_DURATION_RE = (
+    r"^P(?:(?P<d>\d+)D)?(?:T(?:(?P<h>\d+)H)?(?:(?P<m>\d+)M)?(?:(?P<s>\d+)S)?)?$"
+)
+
+_VIDEO_FIELDS = {
+    "id": "vid",
+    "snippet.title": "title",
+    "snippet.channelTitle": "channel",
+    "snippet.channelId": "channel_id",
+    "snippet.publishedAt": "published_at",
+    "snippet.categoryId": "category_id",
+    "statistics.viewCount": "view",
+    "statistics.likeCount": "like",
+    "statistics.commentCount": "comment",
+    "contentDetails.duration": "duration_iso",
+}
+# 큰 것부터. 원본(미리보기/내보내기)은 앞에서부터, 테이블용은 뒤에서부터 첫 번째 존재하는 URL
+_THUMB_TIERS = ["maxres", "standard", "high", "medium", "default"]
+
+
+def normalize_items(video_items, channel_items) -> pd.DataFrame:
+    """videos().list / channels().list 응답 항목을 하나의 타입 지정 DataFrame으로 합친다."""
+    if not video_items:
+        return pd.DataFrame(
+            columns=list(_VIDEO_FIELDS.values())
+            + ["thumbnail", "thumbnail_small", "subs", "video_count", "raw_date"]
+        )
+
+    raw = pd.json_normalize(video_items)
+    df = pd.DataFrame(
+        {new: raw[old] if old in raw else None for old, new in _VIDEO_FIELDS.items()}
+    )
+
+    # 썸네일: 원본은 maxres → ... → default, 테이블(80px)용은 default → ... → maxres
+    df["thumbnail"] = _first_thumb(raw, _THUMB_TIERS)
+    df["thumbnail_small"] = _first_thumb(raw, _THUMB_TIERS[::-1])
+
+    for col in ("view", "like", "comment"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+
+    if channel_items:
+        ch = pd.json_normalize(channel_items)
+        ch = pd.DataFrame({
+            "channel_id": ch["id"],
+            "subs": ch.get("statistics.subscriberCount"),
+            "video_count": ch.get("statistics.videoCount"),
+        }).drop_duplicates("channel_id")
+        df = df.merge(ch, on="channel_id", how="left")
+    else:
+        df["subs"] = 0
+        df["video_count"] = 0
+    for col in ("subs", "video_count"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+
+    df["raw_date"] = pd.to_datetime(df["published_at"].str[:10], errors="coerce")
+    return df.drop_duplicates("vid").reset_index(drop=True)
+
+
+def _first_thumb(raw: pd.DataFrame, tiers) -> pd.Series:
+    """tiers 순서대로 처음 존재하는 썸네일 URL."""
+    thumb = pd.Series(None, index=raw.index, dtype=object)
+    for tier in reversed(tiers):
+        col = f"snippet.thumbnails.{tier}.url"
+        if col in raw:
+            thumb = raw[col].where(raw[col].notna(), thumb)
+    return thumb
+
+
+def duration_seconds(iso: pd.Series) -> pd.Series:
+    """ISO 8601 duration 컬럼을 초 단위 정수로 변환 (파싱 실패는 NaN)."""
+    parts = iso.astype("string").str.extract(_DURATION_RE).astype("float64").fillna(0)
+    sec = parts["d"] * 86400 + parts["h"] * 3600 + parts["m"] * 60 + parts["s"]
+    return sec.where(iso.astype("string").str.match(_DURATION_RE).fillna(False))
+
+
+def format_duration(sec: pd.Series, fallback: pd.Series) -> pd.Series:
+    """초 → mm:ss 또는 h:mm:ss. 파싱 못 한 값은 원래 문자열 그대로."""
+    total = sec.fillna(0).astype("int64")
+    h, rem = total // 3600, total % 3600
+    m, s = (rem // 60).astype(str), (rem % 60).astype(str).str.zfill(2)
+    out = pd.Series(
+        np.where(h > 0, h.astype(str) + ":" + m.str.zfill(2) + ":" + s, m + ":" + s),
+        index=sec.index,
+    )
+    return out.where(sec.notna(), fallback)
+
+
+def score(df: pd.DataFrame, now) -> pd.DataFrame:
+    """성과도 / 등급 / 참여율 / 일일 속도 / 길이(초)를 컬럼 단위로 계산."""
+    df = df.copy()
+    view = df["view"].astype("float64")
+    subs = df["subs"].astype("float64")
+
+    df["raw_perf"] = np.where(subs > 0, view / subs.where(subs > 0, 1) * 100, 0.0)
+    df["grade"] = grade_for(df["raw_perf"])
+    df["raw_engagement"] = np.where(
+        view > 0, df["comment"] / view.where(view > 0, 1) * 100, 0.0
+    )
+
+    days = (pd.Timestamp(now) - df["raw_date"]).dt.days
+    df["velocity"] = view / days.where(days.fillna(0) != 0, 1)
+
+    df["duration_sec"] = duration_seconds(df["duration_iso"])
+    return df
+
+
+def grade_for(ratio: pd.Series) -> np.ndarray:
+    """배수(%) → 등급 (GRADE_BINS 기준)."""
+    return np.select(
+        [ratio >= t for t, _ in GRADE_BINS],
+        [g for _, g in GRADE_BINS],
+        default=GRADE_DEFAULT,
+    )
+
+
+def apply_baseline(df: pd.DataFrame, baselines: pd.DataFrame) -> pd.DataFrame:
+    """채널 기준선(중앙 조회수) 대비 배수 raw_baseline(%)를 붙이고 그 기준으로 등급을 다시 매긴다.
+
+    기준선이 없는 채널(업로드 부족 / 동기화 실패)은 구독자 기준 등급을 그대로 둔다.
+    """
+    df = df.drop(columns=["raw_baseline"], errors="ignore").merge(
+        baselines[["channel_id", "base_median"]], on="channel_id", how="left"
+    )
+    median = df.pop("base_median").astype("float64")
+    df["raw_baseline"] = df["view"] / median.where(median > 0) * 100
+    has_base = df["raw_baseline"].notna()
+    df.loc[has_base, "grade"] = grade_for(df.loc[has_base, "raw_baseline"])
+    return df
+
+
+def filter_mask(df: pd.DataFrame, grades, subs_range) -> pd.Series:
+    """등급 / 구독자 범위 필터를 불리언 마스크로 반환."""
+    return df["grade"].isin(list(grades)) & df["subs"].between(*subs_range)
+
+
+def keyword_stats(df: pd.DataFrame, keywords) -> pd.DataFrame:
+    """키워드별 요약: 영상 수 / 중앙 성과도 / 중앙 조회수 / 등급별 영상 수."""
+    grouped = df.groupby("keyword", sort=False)
+    stats = pd.DataFrame({
+        "영상 수": grouped["vid"].count(),
+        "중앙 성과도": grouped["raw_perf"].median().round(1),
+        "중앙 조회수": grouped["view"].median(),
+    })
+    grades = pd.crosstab(df["keyword"], df["grade"]).reindex(columns=GRADES, fill_value=0)
+    stats = stats.join(grades).reindex(list(keywords)).fillna(0)
+    stats.index.name = "키워드"
+    return stats.astype({c: "int64" for c in ["영상 수", "중앙 조회수", *GRADES]})
+
+
+def to_compact(df: pd.DataFrame, category_names: dict) -> pd.DataFrame:
+    """정렬된 수치 전용 결과 프레임 (세션 간 공유 저장용).
+
+    문자열 포맷 컬럼은 만들지 않고, 반복되는 문자열(채널/카테고리/등급/키워드)은
+    category dtype으로 둔다. 표시 문자열은 format_display로 렌더 시점에 만든다.
+    채널 기준선(raw_baseline)이 있으면 그 배수 순으로 정렬한다 (기준선 없는 영상은 뒤로).
+    """
+    order = ["raw_perf", "raw_date"]
+    if "raw_baseline" in df:
+        order.insert(0, "raw_baseline")
+    df = df.sort_values(order, ascending=False).reset_index(drop=True)
+    out = pd.DataFrame({
+        "vid": df["vid"],
+        "title": df["title"],
+        "channel": df["channel"].astype("category"),
+        "category": df["category_id"].map(category_names).fillna("기타")
+                                     .astype("category"),
+        "grade": pd.Categorical(df["grade"], categories=GRADES),
+        "raw_date": df["raw_date"],
+        "view": df["view"],
+        "like": df["like"],
+        "comment": df["comment"],
+        "video_count": df["video_count"].astype("int32"),
+        "raw_perf": df["raw_perf"].astype("float32"),
+        "raw_engagement": df["raw_engagement"].astype("float32"),
+        "velocity": df["velocity"].fillna(0).astype("int64"),
+        "duration_sec": df["duration_sec"].astype("float32"),
+        # 파싱 못 한 길이만 원문 보관 (표시 fallback)
+        "duration_iso": df["duration_iso"].where(df["duration_sec"].isna()),
+        "thumbnail": df["thumbnail_small"].fillna(df["thumbnail"]),
+    })
+    if "keyword" in df:
+        out.insert(1, "keyword", df["keyword"].astype("category"))
+    if "raw_baseline" in df:
+        out["raw_baseline"] = df["raw_baseline"].astype("float32")
+    for col in ("views_1h", "views_24h"):
+        if col in df:
+            out[col] = df[col].astype("Int64")
+    return out
+
+
+def format_display(compact: pd.DataFrame) -> pd.DataFrame:
+    """to_compact 결과(또는 그 일부 행) → 테이블 표시용 컬럼 (기존 테이블 스키마 그대로).
+
+    No는 정렬 순위(인덱스 + 1)라 페이지 단위로 잘라서 넘겨도 유지된다.
+    """
+    df = compact
+    out = pd.DataFrame({
+        "No": df.index + 1,
+        "썸네일": df["thumbnail"],
+        "채널명": df["channel"].astype(object),
+        "제목": df["title"],
+        "카테고리": df["category"].astype(object),
+        "게시일": df["raw_date"].dt.strftime("%Y/%m/%d"),
+        "총 영상 수": df["video_count"].map("{:,}개".format),
+        "조회수": df["view"].map("{:,}".format),
+        "좋아요": df["like"].map("{:,}".format),
+        "성과도": df["raw_perf"].astype("float64"),
+        "등급": df["grade"].astype(object),
+        "길이": format_duration(df["duration_sec"], df["duration_iso"]),
+        "일일 속도": df["velocity"].map("{:,}회".format),
+        "이동": "https://www.youtube.com/watch?v=" + df["vid"],
+        "ID": df["vid"],
+        "raw_view": df["view"],
+        "raw_perf": df["raw_perf"].astype("float64"),
+        "raw_comment": df["comment"],
+        "raw_like": df["like"],
+        "raw_engagement": df["raw_engagement"].astype("float64"),
+    }, index=df.index)
+
+    # 비교 모드: 어느 키워드로 찾은 영상인지
+    if "keyword" in df:
+        out.insert(1, "키워드", df["keyword"].astype(object))
+
+    # 채널 기준선 대비 배수(%) — 기준선이 없으면 빈 칸
+    if "raw_baseline" in df:
+        out.insert(out.columns.get_loc("성과도") + 1, "채널 대비",
+                   df["raw_baseline"].astype("float64"))
+
+    # 스냅샷 기반 실제 증가량 (쌓인 이력이 없으면 "-")
+    for col, label in (("views_1h", "1시간 조회"), ("views_24h", "24시간 조회")):
+        if col in df:
+            out[label] = df[col].map(lambda v: "-" if pd.isna(v) else f"+{int(v):,}")
+    return out
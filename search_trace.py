@@ -0,0 +1,119 @@
+"""검색 1회 단위 성능/쿼터 트레이스 (단계별 시간, HTTP 호출, 수신 바이트, 쿼터, 캐시 히트)."""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from yt_cache import CACHE_DIR
+
+TRACE_LOG = os.environ.get(
+    "SIGNAL_TRACE_LOG", os.path.join(CACHE_DIR, "search_trace.jsonl")
+)
+
+# 호출당 쿼터 비용 (search=100, list=1). chart는 videos().list(chart="mostPopular")
+QUOTA_COST = {"search": 100, "videos": 1, "channels": 1, "chart": 1, "playlistItems": 1}
+
+
+class SearchTrace:
+    """검색 한 번의 구조화된 트레이스.
+
+    워커 스레드에서 record_call이 동시에 불리므로 카운터는 락으로 보호한다.
+    캐시/저장소에서 나온 응답은 HTTP 호출·쿼터에 포함하지 않는다.
+    """
+
+    def __init__(self, query: str, params: dict = None):
+        self.query = query
+        self.params = params or {}
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.phases = {}
+        self.calls = []
+        self.http_calls = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.parse_seconds = 0.0
+        self.quota = 0
+        self.cache_hits = 0
+        self.store_hits = 0
+        self.pruned = 0
+        self.result_rows = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def record_call(self, endpoint: str, label: str, seconds: float,
+                    nbytes: int = 0, cached: bool = False, nbytes_out: int = 0,
+                    parse_seconds: float = 0.0):
+        with self._lock:
+            self.calls.append({
+                "endpoint": endpoint,
+                "label": label,
+                "ms": round(seconds * 1000, 1),
+                "bytes": nbytes,
+                "bytes_out": nbytes_out,
+                "parse_ms": round(parse_seconds * 1000, 2),
+                "cached": cached,
+            })
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.http_calls += 1
+                self.bytes_in += nbytes
+                self.bytes_out += nbytes_out
+                self.parse_seconds += parse_seconds
+                self.quota += QUOTA_COST.get(endpoint, 1)
+
+    def record_store_hits(self, n: int):
+        with self._lock:
+            self.store_hits += n
+
+    def record_pruned(self, n: int):
+        """필터 푸시다운으로 videos 조회 없이 건너뛴 영상 수."""
+        with self._lock:
+            self.pruned += n
+
+    def cache_stats(self) -> dict:
+        """이 검색의 엔드포인트별 캐시 hit/miss (ResponseCache.stats와 같은 모양)."""
+        out = {}
+        with self._lock:
+            for call in self.calls:
+                ep = out.setdefault(call["endpoint"], {"hits": 0, "misses": 0})
+                ep["hits" if call["cached"] else "misses"] += 1
+        return dict(sorted(out.items()))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "query": self.query,
+                "params": self.params,
+                "phases_ms": {k: round(v * 1000, 1) for k, v in self.phases.items()},
+                "http_calls": self.http_calls,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "parse_ms": round(self.parse_seconds * 1000, 1),
+                "quota": self.quota,
+                "cache_hits": self.cache_hits,
+                "store_hits": self.store_hits,
+                "pruned": self.pruned,
+                "result_rows": self.result_rows,
+                "error": self.error,
+                "calls": list(self.calls),
+            }
+
+    def write_jsonl(self, path: str = None):
+        path = path or TRACE_LOG
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        line = json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
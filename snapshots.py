@@ -0,0 +1,281 @@
+"""조회수 시계열 스냅샷 (추적 영상 주기적 재조회 → 최근 1시간/24시간 실제 증가량).
+
+예) 브라우저 없이 한 번만 수집:
+    python snapshots.py --once
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from key_pool import get_pool, parse_keys, quota_day
+from search_trace import QUOTA_COST, SearchTrace
+from yt_cache import CACHE_DIR
+from yt_fetch import CHUNK_SIZE, chunked, run_concurrent, stats_call
+
+POLL_INTERVAL = 60 * 60
+TRACK_DAYS = 14          # 추적 시작 후 이 기간이 지나면 더 이상 재조회하지 않음
+# 추적 기간별 재조회 간격 (추적 시작 후 경과 초 미만, 간격 초) — 오래된 영상은 드물게
+POLL_TIERS = (
+    (1 * 86400, 60 * 60),
+    (3 * 86400, 3 * 60 * 60),
+    (TRACK_DAYS * 86400, 12 * 60 * 60),
+)
+POLL_SLACK = 5 * 60      # 주기 타이머 오차로 한 회차를 건너뛰지 않도록 여유
+# 스냅샷 수집은 검색과 같은 키 풀을 쓰므로 쿼터 상한을 따로 둔다 (videos 50개당 1 유닛)
+POLL_BUDGET = 40         # 1회 수집 상한 (= 2,000개)
+DAILY_BUDGET = 1_000     # 하루 상한 (태평양 시간 자정 리셋)
+DELTA_WINDOWS = {"views_1h": 60 * 60, "views_24h": 24 * 60 * 60}
+
+# 영상 ID는 정수 키로 한 번만 저장하고, 스냅샷은 (정수 키, 초 단위 시각, 수치)만 append.
+# WITHOUT ROWID + (vid, ts) 기본키라 영상별 시계열이 디스크에 연속으로 붙는다.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked (
+    vid INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    added INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    vid INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    views INTEGER NOT NULL,
+    likes INTEGER,
+    comments INTEGER,
+    PRIMARY KEY (vid, ts)
+) WITHOUT ROWID;
+"""
+
+
+class SnapshotStore:
+    """append-only 조회수 시계열 저장소 (스레드 안전한 SQLite)."""
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "snapshots.sqlite")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def track(self, video_ids) -> int:
+        """추적 목록에 추가. 반환: 새로 추가된 영상 수"""
+        now = int(time.time())
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tracked (video_id, added) VALUES (?, ?)",
+                [(v, now) for v in video_ids],
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def due(self, limit, only_new=False, now=None):
+        """지금 재조회할 차례인 영상 ID를 마지막 스냅샷이 오래된 순으로 최대 limit개.
+
+        재조회 간격은 추적 기간에 따라 POLL_TIERS로 늘어난다.
+        only_new=True면 아직 스냅샷이 하나도 없는 영상만.
+        """
+        now = int(now or time.time())
+        interval = " ".join(
+            f"WHEN added >= {now - age} THEN {gap}" for age, gap in POLL_TIERS
+        )
+        due = "last IS NULL" if only_new else (
+            f"last IS NULL OR last <= {now + POLL_SLACK} - CASE {interval} END"
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id FROM ("
+                "SELECT t.video_id, t.added, "
+                "(SELECT MAX(ts) FROM snapshots s WHERE s.vid = t.vid) AS last "
+                "FROM tracked t WHERE t.added >= ?"
+                f") WHERE {due} ORDER BY last IS NOT NULL, last LIMIT ?",
+                (now - TRACK_DAYS * 86400, limit),
+            ).fetchall()
+        return [video_id for (video_id,) in rows]
+
+    def record(self, items, ts=None):
+        """videos().list 응답 항목의 statistics를 스냅샷으로 추가."""
+        ts = int(ts or time.time())
+        rows = []
+        for item in items:
+            stats = item.get("statistics", {})
+            if "viewCount" not in stats:
+                continue
+            rows.append((
+                ts, int(stats["viewCount"]),
+                int(stats.get("likeCount", 0)), int(stats.get("commentCount", 0)),
+                item["id"],
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO snapshots "
+                "SELECT vid, ?, ?, ?, ? FROM tracked WHERE video_id = ?",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def deltas(self, video_ids, now=None) -> pd.DataFrame:
+        """영상별 최근 구간 조회수 증가량.
+
+        구간 시작 시점 이전 스냅샷이 없거나(추적 기간이 짧으면) 최신 스냅샷이 구간 안에
+        없으면(재조회 간격이 구간보다 길면, 양 끝이 같은 스냅샷이라 +0이 되므로) NaN.
+        재조회 간격이 긴(POLL_TIERS) 오래된 영상은 구간보다 긴 간격의 증가량이 될 수 있다.
+        반환 컬럼: vid, views_1h, views_24h
+        """
+        now = int(now or time.time())
+        cols = ", ".join(
+            f"CASE WHEN latest_ts > {now - sec} THEN "
+            f"latest - (SELECT views FROM snapshots s2 WHERE s2.vid = t.vid "
+            f"AND s2.ts <= {now - sec} ORDER BY s2.ts DESC LIMIT 1) END AS {name}"
+            for name, sec in DELTA_WINDOWS.items()
+        )
+        frames = []
+        for part in chunked(list(video_ids), 500):
+            sql = (
+                f"SELECT video_id AS vid, {cols} FROM ("
+                "SELECT t.vid, t.video_id, s1.ts AS latest_ts, s1.views AS latest "
+                "FROM tracked t LEFT JOIN snapshots s1 ON s1.vid = t.vid AND s1.ts = "
+                "(SELECT MAX(ts) FROM snapshots s WHERE s.vid = t.vid) "
+                f"WHERE t.video_id IN ({','.join('?' * len(part))})"
+                ") t"
+            )
+            with self._lock:
+                frames.append(pd.read_sql_query(sql, self._conn, params=part))
+        if not frames:
+            return pd.DataFrame(columns=["vid", *DELTA_WINDOWS])
+        return pd.concat(frames, ignore_index=True)
+
+    def counts(self) -> dict:
+        with self._lock:
+            tracked = self._conn.execute("SELECT COUNT(*) FROM tracked").fetchone()[0]
+            snaps = self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        return {"tracked": tracked, "snapshots": snaps}
+
+
+def poll(youtube, store: SnapshotStore, trace=None, only_new=False,
+         budget=POLL_BUDGET):
+    """재조회할 차례인 추적 영상을 50개 단위 videos().list(part=statistics)로 재조회.
+
+    budget(유닛) 안에서 마지막 스냅샷이 오래된 영상부터 찍고, 나머지는 다음 회차로 넘긴다.
+    응답 캐시는 거치지 않는다 (항상 현재 값이 필요).
+    반환: (기록한 스냅샷 수, {청크: 에러 메시지}, 사용 쿼터)
+    """
+    trace = trace or SearchTrace("snapshot-poll")
+    ids = store.due(max(0, budget) * CHUNK_SIZE, only_new=only_new)
+    ts = int(time.time())
+    tasks = [
+        (f"snapshot[{i}]", stats_call(youtube, chunk, f"snapshot[{i}]", trace))
+        for i, chunk in enumerate(chunked(ids))
+    ]
+    results, errors = run_concurrent(tasks)
+    recorded = sum(store.record(res.get("items", []), ts) for res in results.values())
+    return recorded, errors, len(tasks) * QUOTA_COST["videos"]
+
+
+class SnapshotCollector:
+    """interval초마다 poll()을 실행하는 백그라운드 스레드 (저장소당 하나).
+
+    poke()를 부르면 주기를 기다리지 않고 새로 추적된 영상의 기준 스냅샷만 바로 찍는다.
+    한 회차는 poll_budget, 하루는 daily_budget 유닛을 넘기지 않는다.
+    use()로 서비스 객체(키 풀)를 넘기기 전까지는 아무것도 호출하지 않는다.
+    """
+
+    def __init__(self, youtube, store: SnapshotStore, interval=POLL_INTERVAL,
+                 poll_budget=POLL_BUDGET, daily_budget=DAILY_BUDGET):
+        self.youtube = youtube
+        self.store = store
+        self.interval = interval
+        self.poll_budget = poll_budget
+        self.daily_budget = daily_budget
+        self.last_run = None
+        self.last_recorded = 0
+        self.last_error = None
+        self.last_failed = 0       # 마지막 회차에서 실패한 청크 수
+        self.failed_total = 0
+        self.day = quota_day()
+        self.units_today = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="snapshot-collector", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def use(self, youtube):
+        """재조회에 쓸 서비스 객체를 바꾼다 (마지막으로 검색한 세션의 키 풀)."""
+        self.youtube = youtube
+
+    def poke(self):
+        self._wake.set()
+
+    def _budget(self) -> int:
+        day = quota_day()
+        if day != self.day:
+            self.day, self.units_today = day, 0
+        return min(self.poll_budget, self.daily_budget - self.units_today)
+
+    def _loop(self):
+        next_full = 0.0
+        while not self._stop.is_set():
+            only_new = time.time() < next_full
+            budget = self._budget()
+            if self.youtube is not None and budget > 0:
+                try:
+                    self.last_recorded, errors, units = poll(
+                        self.youtube, self.store, only_new=only_new, budget=budget
+                    )
+                    self.units_today += units
+                    self.last_failed = len(errors)
+                    self.failed_total += len(errors)
+                    self.last_error = next(iter(errors.values()), None)
+                except Exception as e:
+                    self.last_error = str(e)
+                self.last_run = time.time()
+            if not only_new:
+                next_full = time.time() + self.interval
+            self._wake.wait(max(0.0, next_full - time.time()))
+            self._wake.clear()
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="SIGNAL 조회수 스냅샷 수집")
+    p.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"),
+                   help="YouTube API 키 (여러 개는 콤마 구분)")
+    p.add_argument("--interval", type=int, default=POLL_INTERVAL, help="수집 주기(초)")
+    p.add_argument("--budget", type=int, default=POLL_BUDGET, help="1회 수집 쿼터 상한")
+    p.add_argument("--once", action="store_true", help="한 번만 수집하고 종료")
+    args = p.parse_args(argv)
+    if not args.api_key:
+        print("🔑 API 키가 없습니다 (--api-key 또는 YOUTUBE_API_KEY).", file=sys.stderr)
+        return 2
+
+    youtube, store = get_pool(parse_keys(args.api_key)), SnapshotStore()
+    while True:
+        n, errors, units = poll(youtube, store, budget=args.budget)
+        print(f"📸 {n:,}개 스냅샷 · 쿼터 {units:,} · {store.counts()}")
+        for label, err in errors.items():
+            print(f"⚠️ {label} 실패: {err}", file=sys.stderr)
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+from entity_store import EntityStore
+from replay import SyntheticClient
+from yt_cache import ResponseCache
+from yt_fetch import collect, deep_collect
+
+
+def _deep(tmp_path, subs_range):
+    youtube = SyntheticClient(2_000, seed=1)
+    cache = ResponseCache(str(tmp_path / f"cache-{subs_range is not None}.sqlite"))
+    videos, channels, errors, quota = deep_collect(
+        youtube, cache, {"part": "snippet", "q": "x"}, [None],
+        target=500, quota_budget=200, subs_range=subs_range,
+    )
+    subs = {c["id"]: int(c["statistics"]["subscriberCount"]) for c in channels}
+    return videos, subs, errors
+
+
+def test_deep_collect_pushdown_fetches_carry_when_budget_runs_out(tmp_path):
+    subs_range = (0, 3_000)
+    plain, plain_subs, _ = _deep(tmp_path, None)
+    expected = {
+        v["id"] for v in plain
+        if subs_range[0] <= plain_subs[v["snippet"]["channelId"]] <= subs_range[1]
+    }
+    assert expected
+
+    pushed, _, errors = _deep(tmp_path, subs_range)
+    assert not errors
+    assert {v["id"] for v in pushed} == expected
+
+
+def test_stale_store_entities_are_refetched_past_response_cache(tmp_path):
+    youtube = SyntheticClient(500, seed=1)
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    params = {"part": "snippet", "q": "x"}
+    collect(youtube, cache, params, [None], store=EntityStore(str(tmp_path / "a.sqlite")))
+    before = youtube.calls["videos"]
+    assert before
+
+    # 저장소 항목이 모두 오래됐으면 응답 캐시가 아직 유효해도 API로 다시 받는다
+    stale = EntityStore(str(tmp_path / "a.sqlite"), max_age={"videos": -1})
+    videos, _, errors, _ = collect(youtube, cache, params, [None], store=stale)
+    assert not errors and videos
+    assert youtube.calls["videos"] > before
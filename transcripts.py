@@ -0,0 +1,186 @@
+"""영상 자막 지연 로딩 (압축 디스크 캐시 + 백그라운드 병렬 다운로드)."""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import youtube_transcript_api
+from youtube_transcript_api import (
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    YouTubeTranscriptApi,
+)
+
+from yt_cache import CACHE_DIR
+
+LANGUAGES = ("ko", "en", "ja")
+MAX_WORKERS = 4
+PREFETCH_TOP_N = 10
+# 자막이 없던 영상은 이 기간 동안 다시 시도하지 않음
+NEGATIVE_TTL = 7 * 24 * 60 * 60
+# 그 외 실패(IP 차단 / 네트워크 등)는 이 시간이 지나거나 직접 다시 시도할 때까지 재요청하지 않음
+ERROR_RETRY_SECONDS = 10 * 60
+# 다시 받아도 결과가 같은 실패 → 자막 없음으로 부정 캐시 (구버전에 없는 예외는 건너뜀)
+_NO_TRANSCRIPT = (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable) + tuple(
+    getattr(youtube_transcript_api, name)
+    for name in ("AgeRestricted", "VideoUnplayable", "InvalidVideoId")
+    if hasattr(youtube_transcript_api, name)
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    body BLOB,
+    PRIMARY KEY (video_id, lang)
+);
+"""
+
+
+def download(video_id: str, languages=LANGUAGES):
+    """자막 한 건 다운로드. 반환: (언어 코드, [{text, start, duration}, ...])"""
+    api = YouTubeTranscriptApi()
+    if hasattr(api, "fetch"):
+        fetched = api.fetch(video_id, languages=list(languages))
+        return fetched.language_code, fetched.to_raw_data()
+    # youtube-transcript-api < 1.0
+    segments = YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
+    return languages[0], segments
+
+
+def to_text(segments) -> str:
+    return " ".join(s["text"].replace("\n", " ") for s in segments)
+
+
+class TranscriptCache:
+    """(video_id, lang) 단위로 zlib 압축해 SQLite에 보관. 자막 없음도 lang=""로 기록."""
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "transcripts.sqlite")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, video_id: str, languages=LANGUAGES):
+        """반환: (lang, segments) / 자막 없음으로 기록됐으면 ("", None) / 미조회면 None"""
+        with self._lock:
+            rows = dict(
+                (lang, (fetched_at, body))
+                for lang, fetched_at, body in self._conn.execute(
+                    "SELECT lang, fetched_at, body FROM transcripts WHERE video_id = ?",
+                    (video_id,),
+                )
+            )
+        for lang in languages:
+            if lang in rows:
+                return lang, json.loads(zlib.decompress(rows[lang][1]))
+        if "" in rows and time.time() - rows[""][0] < NEGATIVE_TTL:
+            return "", None
+        return None
+
+    def put(self, video_id: str, lang: str, segments):
+        body = None
+        if segments is not None:
+            body = zlib.compress(json.dumps(segments, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)",
+                (video_id, lang, time.time(), body),
+            )
+            self._conn.commit()
+
+
+class TranscriptService:
+    """자막을 백그라운드에서 받아 캐시에 넣는다. 화면 쪽은 절대 다운로드를 기다리지 않는다.
+
+    - request(video_id): 캐시에 없으면 다운로드 예약 (이미 진행 중이거나
+      ERROR_RETRY_SECONDS 안에 실패했으면 무시, retry=True면 실패와 상관없이 다시)
+    - get(video_id): ("ready", lang, segments) / ("pending", ...) / ("none", ...) /
+      ("error", "", 메시지)
+    on_ready(video_id, text)는 새 자막을 받을 때마다 워커 스레드에서 호출된다.
+    """
+
+    def __init__(self, cache: TranscriptCache = None, max_workers=MAX_WORKERS,
+                 languages=LANGUAGES, on_ready=None):
+        self.cache = cache or TranscriptCache()
+        self.languages = languages
+        self.on_ready = on_ready
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="transcript"
+        )
+        self._inflight = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str):
+        cached = self.cache.get(video_id, self.languages)
+        if cached is not None:
+            lang, segments = cached
+            if segments is None:
+                return "none", "", None
+            return "ready", lang, segments
+        with self._lock:
+            if video_id in self._inflight:
+                return "pending", "", None
+            if video_id in self._errors:
+                return "error", "", self._errors[video_id][0]
+        return "missing", "", None
+
+    def request(self, video_id: str, retry=False):
+        if self.cache.get(video_id, self.languages) is not None:
+            return
+        with self._lock:
+            if video_id in self._inflight:
+                return
+            failed = self._errors.get(video_id)
+            if (failed is not None and not retry
+                    and time.time() - failed[1] < ERROR_RETRY_SECONDS):
+                return
+            self._errors.pop(video_id, None)
+            self._inflight[video_id] = self._pool.submit(self._fetch, video_id)
+
+    def prefetch(self, video_ids, top_n=PREFETCH_TOP_N):
+        for video_id in list(video_ids)[:top_n]:
+            self.request(video_id)
+
+    def _fetch(self, video_id: str):
+        try:
+            lang, segments = download(video_id, self.languages)
+            self.cache.put(video_id, lang, segments)
+            if self.on_ready is not None:
+                self.on_ready(video_id, to_text(segments))
+        except _NO_TRANSCRIPT:
+            # 자막 비활성/없음/연령 제한 등은 부정 캐시, 그 외(네트워크 등)는 잠시 뒤 재시도
+            self.cache.put(video_id, "", None)
+        except Exception as e:
+            with self._lock:
+                self._errors[video_id] = (str(e), time.time())
+        finally:
+            with self._lock:
+                self._inflight.pop(video_id, None)
+
+    def fetch_many(self, video_ids) -> dict:
+        """일괄 분석용 (블로킹): {video_id: 자막 텍스트}. 자막 없는 영상은 제외."""
+        video_ids = list(video_ids)
+        for video_id in video_ids:
+            self.request(video_id)
+        with self._lock:
+            futures = [self._inflight[v] for v in video_ids if v in self._inflight]
+        for fut in futures:
+            fut.result()
+        out = {}
+        for video_id in video_ids:
+            cached = self.cache.get(video_id, self.languages)
+            if cached is not None and cached[1] is not None:
+                out[video_id] = to_text(cached[1])
+        return out
@@ -0,0 +1,151 @@
+"""YouTube API 응답 캐시 (SQLite 디스크 백엔드, 엔드포인트별 TTL)."""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# -------------------------------------------------------------------------
+# ⭐ [설정]
+# -------------------------------------------------------------------------
+CACHE_DIR = os.environ.get("SIGNAL_CACHE_DIR", ".signal_cache")
+
+# 엔드포인트별 TTL(초): 검색 결과는 짧게, 채널 통계는 길게
+DEFAULT_TTL = {
+    "search": 30 * 60,
+    "chart": 30 * 60,
+    "videos": 2 * 60 * 60,
+    "channels": 24 * 60 * 60,
+}
+DEFAULT_MAX_ENTRIES = 20_000
+# 히트 시각(LRU용)은 모아서 기록하고, 개수 확인(정리)은 저장 몇 번에 한 번만
+TOUCH_BATCH = 256
+TOUCH_FLUSH_SECONDS = 30
+EVICT_EVERY = 200
+
+
+def normalize_params(endpoint: str, params: dict) -> str:
+    """요청 파라미터를 정규화해 캐시 키 문자열로 만든다.
+
+    None 값은 제거하고, 콤마로 이어진 id 목록은 정렬해서
+    같은 ID 집합이면 순서와 무관하게 같은 키가 되도록 한다.
+    """
+    norm = {}
+    for k, v in params.items():
+        if v is None:
+            continue
+        if k == "id" and isinstance(v, str):
+            v = ",".join(sorted(set(v.split(","))))
+        elif k == "q" and isinstance(v, str):
+            v = " ".join(v.split()).lower()
+        norm[k] = v
+    return endpoint + ":" + json.dumps(norm, sort_keys=True, ensure_ascii=False)
+
+
+class ResponseCache:
+    """스레드 안전한 SQLite 응답 캐시.
+
+    - 엔드포인트별 TTL (만료된 항목은 조회 시 miss 처리)
+    - max_entries 초과 시 마지막 접근이 오래된 순으로 제거
+      (히트마다 쓰지 않고 접근 시각을 모아 기록, 개수는 EVICT_EVERY번 저장마다 확인)
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=DEFAULT_MAX_ENTRIES):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "api_cache.sqlite")
+        self.path = path
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.max_entries = max_entries
+        self._touched = {}        # key → 아직 기록하지 않은 마지막 접근 시각
+        self._flushed_at = time.time()
+        self._sets = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)"
+        )
+        self._conn.commit()
+
+    # ---------------- 기본 조회/저장 ----------------
+    def get(self, endpoint: str, params: dict):
+        key = normalize_params(endpoint, params)
+        ttl = self.ttl.get(endpoint, 0)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[0] > ttl:
+                return None
+            self._touched[key] = now
+            if (len(self._touched) >= TOUCH_BATCH
+                    or now - self._flushed_at >= TOUCH_FLUSH_SECONDS):
+                self._flush_touched()
+                self._conn.commit()
+        return json.loads(zlib.decompress(row[1]))
+
+    def set(self, endpoint: str, params: dict, response: dict):
+        key = normalize_params(endpoint, params)
+        body = zlib.compress(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, now, now, body),
+            )
+            self._touched.pop(key, None)
+            self._sets += 1
+            if self._sets % EVICT_EVERY == 1:
+                self._flush_touched()
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        """모아 둔 접근 시각을 한 번에 기록 (락 안에서 호출, 커밋은 호출한 쪽에서)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self._touched.clear()
+        self._flushed_at = time.time()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count <= self.max_entries:
+            return
+        # 만료 항목부터 정리하고, 그래도 넘치면 LRU 순으로 제거
+        now = time.time()
+        for endpoint, ttl in self.ttl.items():
+            self._conn.execute(
+                "DELETE FROM responses WHERE endpoint = ? AND created < ?",
+                (endpoint, now - ttl),
+            )
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
@@ -0,0 +1,102 @@
+"""프로세스 전역 YouTube API 클라이언트 풀 (API 키별 1회 build, 스레드별 keep-alive 커넥션)."""
+import threading
+import time
+
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.model import JsonModel
+
+HTTP_TIMEOUT = 30
+
+_lock = threading.Lock()
+_clients = {}
+_build_seconds = {}
+_reuse_count = {}
+
+# googleapiclient의 httplib2 커넥션은 스레드 안전하지 않으므로 스레드별로 하나씩 둔다.
+# httplib2.Http는 호스트별 커넥션을 유지(keep-alive)하므로 같은 스레드의 다음 호출은
+# TCP/TLS 핸드셰이크 없이 재사용된다.
+_local = threading.local()
+
+
+class CountingHttp(httplib2.Http):
+    """마지막 요청의 송수신 크기와 응답 파싱 시간을 기록하는 httplib2.Http (스레드별 1개라 안전).
+
+    last_bytes_out은 요청 URL(쿼리 포함) + 헤더 + 본문 크기.
+    """
+
+    last_bytes = 0
+    last_bytes_out = 0
+    last_parse_seconds = 0.0
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        resp, content = super().request(uri, method, body, headers, *args, **kwargs)
+        self.last_bytes = len(content or b"")
+        self.last_bytes_out = len(uri) + len(body or b"") + sum(
+            len(k) + len(v) for k, v in (headers or {}).items()
+        )
+        return resp, content
+
+
+class TimedJsonModel(JsonModel):
+    """응답 JSON 파싱 시간을 현재 스레드의 CountingHttp에 남기는 JsonModel."""
+
+    def response(self, resp, content):
+        started = time.perf_counter()
+        try:
+            return super().response(resp, content)
+        finally:
+            thread_http().last_parse_seconds = time.perf_counter() - started
+
+
+def thread_http():
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = CountingHttp(timeout=HTTP_TIMEOUT)
+    return http
+
+
+def measured_execute(request, http):
+    """request.execute(http=http) 후 (응답, record_call에 넘길 송수신/파싱 계측값)."""
+    http.last_bytes = http.last_bytes_out = 0
+    http.last_parse_seconds = 0.0
+    response = request.execute(http=http)
+    return response, {
+        "nbytes": http.last_bytes,
+        "nbytes_out": http.last_bytes_out,
+        "parse_seconds": http.last_parse_seconds,
+    }
+
+
+def get_client(api_key: str):
+    """API 키별로 한 번만 build()한 서비스 객체를 돌려준다.
+
+    서비스 객체로 요청을 만드는 것은 여러 스레드에서 해도 되지만,
+    실행은 execute(http=thread_http())로 스레드별 커넥션을 써야 한다.
+    """
+    with _lock:
+        client = _clients.get(api_key)
+        if client is not None:
+            _reuse_count[api_key] += 1
+            return client
+        started = time.perf_counter()
+        client = build(
+            "youtube", "v3",
+            developerKey=api_key,
+            model=TimedJsonModel(),
+            cache_discovery=False,
+            static_discovery=True,
+        )
+        _build_seconds[api_key] = time.perf_counter() - started
+        _reuse_count[api_key] = 0
+        _clients[api_key] = client
+        return client
+
+
+def client_stats(api_key: str) -> dict:
+    """build 소요 시간과 재사용 횟수 (get_client 호출 기준 — 키 풀에서는 API 호출마다 1회)."""
+    with _lock:
+        return {
+            "build_ms": _build_seconds.get(api_key, 0.0) * 1000,
+            "reuse_count": _reuse_count.get(api_key, 0),
+        }
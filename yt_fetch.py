@@ -0,0 +1,570 @@
+"""YouTube API 병렬 호출 (지역별 검색 / 50개 단위 videos·channels 조회)."""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from googleapiclient.errors import HttpError
+
+from api_fields import FIELDS
+from key_pool import error_reason
+from search_trace import QUOTA_COST
+from yt_cache import normalize_params
+from yt_client import measured_execute, thread_http
+
+MAX_WORKERS = 8
+CHUNK_SIZE = 50
+_PARTS = {"videos": "statistics,snippet,contentDetails", "channels": "statistics"}
+# 지역에서 제공하지 않는 차트/카테고리 조합 — 실패가 아니라 빈 차트로 본다
+_CHART_UNAVAILABLE = {
+    "videoChartNotFound", "videoCategoryNotFound", "invalidVideoCategoryId",
+    "invalidCategoryId",
+}
+
+# 워커 스레드(와 스레드별 keep-alive 커넥션)를 검색 간에 재사용하도록 풀을 하나만 둔다
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="yt-fetch"
+            )
+        return _pool
+
+
+def chunked(ids, size=CHUNK_SIZE):
+    return [ids[i: i + size] for i in range(0, len(ids), size)]
+
+
+def run_concurrent(tasks):
+    """(label, fn) 목록을 공용 풀에서 병렬 실행.
+
+    반환: (results, errors) — results는 {label: 반환값},
+    errors는 {label: 예외 메시지}. 한 작업이 실패해도 나머지 결과는 유지된다.
+    """
+    results, errors = {}, {}
+    pool = _executor()
+    futures = {pool.submit(fn): label for label, fn in tasks}
+    for fut, label in futures.items():
+        try:
+            results[label] = fut.result()
+        except Exception as e:
+            errors[label] = str(e)
+    return results, errors
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합친다. 먼저 온 호출만 실행하고 나머지는 결과를 기다린다."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """반환: (결과, 다른 호출의 결과를 받았는지). 실행한 호출의 예외는 대기자에게도 전달된다."""
+        with self._lock:
+            flight = self._calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._calls[key] = {"done": threading.Event()}
+        if not leader:
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["result"], True
+        try:
+            flight["result"] = fn()
+        except BaseException as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            flight["done"].set()
+        return flight["result"], False
+
+
+# 세션(스레드)이 달라도 같은 요청이 동시에 캐시를 놓치면 API 호출은 한 번만
+_inflight = SingleFlight()
+
+
+def _call(cache, endpoint, method, params, label, trace=None):
+    """캐시 확인 → 스레드별 커넥션으로 실행 → 캐시 저장. trace가 있으면 호출을 기록.
+
+    캐시에 없는 같은 요청이 이미 진행 중이면 그 응답을 같이 받는다 (캐시 히트로 기록).
+    cache=None이면 응답 캐시를 거치지 않는다 (동시 호출 합치기만).
+    """
+    def fetch():
+        response, io = measured_execute(method(**params), thread_http())
+        if cache is not None:
+            cache.set(endpoint, params, response)
+        return response, io
+
+    def run():
+        started = time.perf_counter()
+        response = cache.get(endpoint, params) if cache is not None else None
+        if response is not None:
+            if trace is not None:
+                trace.record_call(endpoint, label, time.perf_counter() - started,
+                                  cached=True)
+            return response
+        (response, io), shared = _inflight.do(normalize_params(endpoint, params), fetch)
+        if trace is not None:
+            trace.record_call(endpoint, label, time.perf_counter() - started,
+                              cached=shared, **({} if shared else io))
+        return response
+    return run
+
+
+def stats_call(youtube, ids, label, trace):
+    """videos().list(part=statistics) 한 청크. 캐시 없이 항상 현재 값 (스냅샷 / 채널 기준선용)."""
+    def run():
+        started = time.perf_counter()
+        res, io = measured_execute(youtube.videos().list(
+            part="statistics", id=",".join(ids), fields=FIELDS["statistics"]
+        ), thread_http())
+        trace.record_call("videos", label, time.perf_counter() - started, **io)
+        return res
+    return run
+
+
+def _region_label(region_code):
+    return region_code or "전체"
+
+
+def fetch_videos_and_channels(youtube, cache, video_ids, channel_ids, store=None,
+                              trace=None, subs_range=None, channel_of=None):
+    """검색 스니펫에 channelId가 이미 있으므로 videos/channels 청크를 한 풀에서 동시에 호출.
+
+    store(EntityStore)를 주면 신선한 엔티티는 저장소에서 가져오고
+    없거나 오래된 ID만 API로 요청한 뒤 저장소에 반영한다.
+    subs_range와 channel_of({video_id: channel_id})를 주면 채널을 먼저 조회하고,
+    구독자 범위 밖 채널의 영상은 videos().list를 호출하지 않는다 (필터 푸시다운).
+
+    반환: (video_items, channel_items, errors, list_calls)
+    """
+    stored_channels, c_tasks = _entity_tasks(
+        youtube, cache, "channels", channel_ids, store, trace
+    )
+    if subs_range is not None and channel_of is not None:
+        channel_items, errors = _run_entity_tasks(c_tasks, stored_channels, "channels", store)
+        video_ids = prune_videos(video_ids, channel_of, channel_items, subs_range, trace)
+        stored_videos, v_tasks = _entity_tasks(
+            youtube, cache, "videos", video_ids, store, trace
+        )
+        video_items, v_errors = _run_entity_tasks(v_tasks, stored_videos, "videos", store)
+        errors.update(v_errors)
+        return video_items, channel_items, errors, len(v_tasks) + len(c_tasks)
+
+    stored_videos, v_tasks = _entity_tasks(youtube, cache, "videos", video_ids, store, trace)
+    results, errors = run_concurrent(v_tasks + c_tasks)
+    video_items, _ = _collect(v_tasks, results, {})
+    channel_items, _ = _collect(c_tasks, results, {})
+    if store is not None:
+        store.put("videos", video_items)
+        store.put("channels", channel_items)
+    video_items.extend(stored_videos)
+    channel_items.extend(stored_channels)
+    return video_items, channel_items, errors, len(v_tasks) + len(c_tasks)
+
+
+def subscriber_count(channel_item) -> int:
+    return int(channel_item.get("statistics", {}).get("subscriberCount", 0))
+
+
+def prune_videos(video_ids, channel_of, channel_items, subs_range, trace=None):
+    """구독자 범위 밖 채널의 영상 ID를 뺀다. 채널 정보가 없는(조회 실패) 영상은 남긴다."""
+    subs = {c["id"]: subscriber_count(c) for c in channel_items}
+    lo, hi = subs_range
+    keep = [
+        v for v in video_ids
+        if channel_of.get(v) not in subs or lo <= subs[channel_of[v]] <= hi
+    ]
+    if trace is not None:
+        trace.record_pruned(len(video_ids) - len(keep))
+    return keep
+
+
+def _entity_tasks(youtube, cache, kind, ids, store=None, trace=None, prefix=""):
+    """저장소에서 신선한 항목을 꺼내고, 나머지 ID로 50개 단위 청크 작업을 만든다.
+
+    저장소를 쓰면 응답 캐시는 거치지 않는다. 오래돼서 다시 받는 ID에 캐시된 (max_age보다
+    오래됐을 수 있는) 응답을 주면 저장소가 그걸 방금 조회한 것으로 기록하기 때문.
+
+    반환: (저장소 항목 목록, [(label, fn), ...])
+    """
+    stored = {}
+    if store is not None:
+        stored, ids = store.lookup(kind, ids)
+        cache = None
+        if trace is not None:
+            trace.record_store_hits(len(stored))
+    method = youtube.videos().list if kind == "videos" else youtube.channels().list
+    tasks = _chunk_tasks(method, cache, kind, ids, _PARTS[kind], trace, prefix)
+    return list(stored.values()), tasks
+
+
+def _run_entity_tasks(tasks, stored, kind, store=None):
+    results, errors = run_concurrent(tasks)
+    items, _ = _collect(tasks, results, {})
+    if store is not None:
+        store.put(kind, items)
+    return items + stored, errors
+
+
+def _chunk_tasks(method, cache, endpoint, ids, part, trace=None, prefix=""):
+    tasks = []
+    for i, chunk in enumerate(chunked(ids)):
+        label = f"{endpoint}[{prefix}{i}]"
+        params = {"part": part, "id": ",".join(chunk), "fields": FIELDS[endpoint]}
+        tasks.append((label, _call(cache, endpoint, method, params, label, trace)))
+    return tasks
+
+
+def _collect(tasks, results, errors):
+    items = []
+    for label, _ in tasks:
+        if label in results:
+            items.extend(results[label].get("items", []))
+    return items, errors
+
+
+# -------------------------------------------------------------------------
+# 수집 모드
+# -------------------------------------------------------------------------
+def collect(youtube, cache, base_params, regions, store=None, trace=None,
+            on_partial=None, subs_range=None):
+    """기본 수집: 지역별 첫 페이지만 검색 후 videos/channels 조회.
+
+    모든 지역을 기다리지 않고, 검색이 끝난 지역의 새 ID부터 바로 videos/channels
+    청크를 요청한다. on_partial(video_items, channel_items)은 채널 정보까지 갖춘
+    영상이 늘어날 때마다 메인 스레드에서 누적 목록으로 호출된다.
+    subs_range를 주면 채널을 먼저 조회하고 범위 안 채널의 영상만 videos().list로 받는다.
+
+    반환: (video_items, channel_items, errors, quota_used)
+    """
+    pool = _executor()
+    pending = {}
+    for region_code in regions:
+        params = dict(base_params)
+        if region_code:
+            params["regionCode"] = region_code
+        label = f"search[{_region_label(region_code)}]"
+        fn = _call(cache, "search", youtube.search().list, params, label, trace)
+        pending[pool.submit(fn)] = ("search", label, region_code)
+
+    errors = {}
+    quota_used = QUOTA_COST["search"] * len(regions)
+    seen_videos, requested_channels, channels_done = set(), set(), set()
+    channels, waiting, ready = {}, [], []
+    held, to_fetch, batch = [], [], 0   # 푸시다운: 채널 대기 중 (영상, 채널) / 조회할 영상
+
+    def submit(kind, ids, prefix):
+        nonlocal quota_used
+        stored, tasks = _entity_tasks(youtube, cache, kind, ids, store, trace, prefix)
+        if kind == "videos":
+            waiting.extend(stored)
+        else:
+            channels.update((c["id"], c) for c in stored)
+            channels_done.update(c["id"] for c in stored)
+        stored_ids = {x["id"] for x in stored}
+        remaining = [i for i in dict.fromkeys(ids) if i not in stored_ids]
+        for (label, fn), chunk in zip(tasks, chunked(remaining)):
+            pending[pool.submit(fn)] = (kind, label, chunk)
+        quota_used += len(tasks) * QUOTA_COST[kind]
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            kind, label, payload = pending.pop(fut)
+            try:
+                res = fut.result()
+            except Exception as e:
+                errors[label] = str(e)
+                if kind == "channels":
+                    # 실패한 채널의 영상도 구독자 0으로 내보낸다
+                    channels_done.update(payload)
+                continue
+            items = res.get("items", [])
+            if kind == "search":
+                new_videos, new_channels = [], []
+                for item in items:
+                    vid = item["id"]["videoId"]
+                    if vid in seen_videos:
+                        continue
+                    seen_videos.add(vid)
+                    ch = item["snippet"]["channelId"]
+                    new_videos.append((vid, ch))
+                    if ch not in requested_channels:
+                        requested_channels.add(ch)
+                        new_channels.append(ch)
+                prefix = f"{_region_label(payload)}/"
+                submit("channels", new_channels, prefix)
+                if subs_range is None:
+                    submit("videos", [v for v, _ in new_videos], prefix)
+                else:
+                    held.extend(new_videos)
+            elif kind == "videos":
+                if store is not None:
+                    store.put("videos", items)
+                waiting.extend(items)
+            else:
+                if store is not None:
+                    store.put("channels", items)
+                channels.update((c["id"], c) for c in items)
+                channels_done.update(payload)
+
+        if held:
+            decided = [(v, ch) for v, ch in held if ch in channels_done]
+            held = [(v, ch) for v, ch in held if ch not in channels_done]
+            to_fetch.extend(prune_videos(
+                [v for v, _ in decided], dict(decided),
+                [channels[ch] for _, ch in decided if ch in channels],
+                subs_range, trace,
+            ))
+        # 50개가 모였거나 더 기다릴 채널 조회가 없으면 바로 요청 (첫 결과를 늦추지 않도록)
+        channels_pending = any(k == "channels" for k, _, _ in pending.values())
+        if to_fetch and (len(to_fetch) >= CHUNK_SIZE or not channels_pending):
+            submit("videos", to_fetch, f"+{batch}/")
+            to_fetch, batch = [], batch + 1
+
+        # 채널 조회가 끝난 영상만 결과로 넘긴다 (구독자 수가 있어야 성과도 계산 가능)
+        still_waiting = []
+        for item in waiting:
+            if item["snippet"]["channelId"] in channels_done:
+                ready.append(item)
+            else:
+                still_waiting.append(item)
+        if on_partial is not None and len(still_waiting) < len(waiting):
+            on_partial(ready, list(channels.values()))
+        waiting = still_waiting
+
+    return ready + waiting, list(channels.values()), errors, quota_used
+
+
+def collect_keywords(youtube, cache, params_by_keyword, regions, store=None,
+                     trace=None, subs_range=None):
+    """여러 키워드 비교용 수집: 키워드×지역 검색을 한 번에 병렬 호출하고,
+    모든 키워드의 영상/채널 ID를 합친 뒤 videos/channels는 ID당 한 번만 조회.
+
+    반환: (video_items, channel_items, {keyword: [video_id, ...]}, errors, quota_used)
+    """
+    tasks = []
+    for keyword, base_params in params_by_keyword.items():
+        for region_code in regions:
+            params = dict(base_params)
+            if region_code:
+                params["regionCode"] = region_code
+            label = f"search[{keyword}/{_region_label(region_code)}]"
+            tasks.append((
+                (keyword, region_code),
+                _call(cache, "search", youtube.search().list, params, label, trace),
+            ))
+    results, search_errors = run_concurrent(tasks)
+    errors = {
+        f"search[{k}/{_region_label(r)}]": e for (k, r), e in search_errors.items()
+    }
+
+    channel_of, keyword_vids = {}, {}
+    for (keyword, region_code), _ in tasks:
+        vids = keyword_vids.setdefault(keyword, {})
+        for item in results.get((keyword, region_code), {}).get("items", []):
+            video_id = item["id"]["videoId"]
+            vids[video_id] = None
+            channel_of.setdefault(video_id, item["snippet"]["channelId"])
+    keyword_vids = {k: list(v) for k, v in keyword_vids.items()}
+
+    video_ids = list(channel_of)
+    channel_ids = list(dict.fromkeys(channel_of.values()))
+    quota_used = QUOTA_COST["search"] * len(tasks)
+    if not video_ids:
+        return [], [], keyword_vids, errors, quota_used
+
+    video_items, channel_items, fetch_errors, list_calls = fetch_videos_and_channels(
+        youtube, cache, video_ids, channel_ids, store, trace,
+        subs_range=subs_range, channel_of=channel_of,
+    )
+    errors.update(fetch_errors)
+    quota_used += list_calls * QUOTA_COST["videos"]
+    return video_items, channel_items, keyword_vids, errors, quota_used
+
+
+def deep_collect(youtube, cache, base_params, regions, target, quota_budget,
+                 on_progress=None, store=None, trace=None, on_partial=None,
+                 subs_range=None):
+    """딥 수집: nextPageToken을 따라가며 target개까지 수집.
+
+    - 매 라운드마다 살아있는 지역의 다음 페이지를 병렬로 요청
+    - 새로 나온 ID만 중복 제거 후 바로 videos/channels 조회 (스트리밍 배치)
+    - 다음 라운드 검색 비용이 quota_budget을 넘으면 중단
+    - subs_range를 주면 채널을 먼저 보고 범위 밖 채널의 영상은 videos 조회에서 제외
+    on_progress(수집 개수, 사용 쿼터)와 on_partial(video_items, channel_items)은
+    라운드마다 메인 스레드에서 호출된다.
+
+    반환: (video_items, channel_items, errors, quota_used)
+    """
+    params = dict(base_params, maxResults=CHUNK_SIZE)
+    page_tokens = {r: None for r in regions}
+    active = list(regions)
+    seen_videos, seen_channels, channel_of, carry = set(), set(), {}, []
+    video_items, channel_items, errors = [], [], {}
+    quota_used = 0
+    page = 0
+
+    while active and len(seen_videos) < target:
+        affordable = (quota_budget - quota_used) // QUOTA_COST["search"]
+        active = active[:max(0, affordable)]
+        if not active:
+            break
+
+        tasks = []
+        for r in active:
+            p = dict(params)
+            if r:
+                p["regionCode"] = r
+            if page_tokens[r]:
+                p["pageToken"] = page_tokens[r]
+            label = f"search[{_region_label(r)}#{page}]"
+            tasks.append(
+                (r, _call(cache, "search", youtube.search().list, p, label, trace))
+            )
+        results, search_errors = run_concurrent(tasks)
+        quota_used += QUOTA_COST["search"] * len(tasks)
+        for r, e in search_errors.items():
+            errors[f"search[{_region_label(r)}#{page}]"] = e
+
+        new_videos, new_channels, next_active = [], [], []
+        for r in active:
+            res = results.get(r)
+            if res is None:
+                continue
+            for item in res.get("items", []):
+                vid = item["id"]["videoId"]
+                if vid in seen_videos or len(seen_videos) >= target:
+                    continue
+                seen_videos.add(vid)
+                new_videos.append(vid)
+                ch = channel_of[vid] = item["snippet"]["channelId"]
+                if ch not in seen_channels:
+                    seen_channels.add(ch)
+                    new_channels.append(ch)
+            if res.get("nextPageToken"):
+                page_tokens[r] = res["nextPageToken"]
+                next_active.append(r)
+        active = next_active
+        page += 1
+
+        if subs_range is None:
+            batches = [(new_videos, new_channels)] if new_videos else []
+        else:
+            # 채널 먼저 → 범위 안 영상만 남기고, 50개 청크가 꽉 찰 때까지 다음 라운드로 넘긴다
+            _, c_items, fetch_errors, list_calls = fetch_videos_and_channels(
+                youtube, cache, [], new_channels, store, trace
+            )
+            channel_items.extend(c_items)
+            errors.update({f"{k}#{page}": e for k, e in fetch_errors.items()})
+            quota_used += list_calls * QUOTA_COST["channels"]
+            carry += prune_videos(new_videos, channel_of, channel_items, subs_range, trace)
+            # 채널 조회 비용까지 더한 뒤에 다음 라운드가 가능한지 본다
+            more = (active and len(seen_videos) < target
+                    and quota_budget - quota_used >= QUOTA_COST["search"])
+            cut = len(carry) - len(carry) % CHUNK_SIZE if more else len(carry)
+            batches = [(carry[:cut], [])] if cut else []
+            carry = carry[cut:]
+
+        for fetch_ids, fetch_channels_ids in batches:
+            v_items, c_items, fetch_errors, list_calls = fetch_videos_and_channels(
+                youtube, cache, fetch_ids, fetch_channels_ids, store, trace
+            )
+            video_items.extend(v_items)
+            channel_items.extend(c_items)
+            errors.update({f"{k}#{page}": e for k, e in fetch_errors.items()})
+            quota_used += list_calls * QUOTA_COST["videos"]
+
+        if on_progress:
+            on_progress(len(seen_videos), quota_used)
+        if on_partial is not None and batches:
+            on_partial(video_items, channel_items)
+
+    if carry:
+        # 영상 조회 비용 때문에 다음 라운드 전에 예산이 끝나도 모아 둔 영상은 버리지 않는다
+        v_items, _, fetch_errors, list_calls = fetch_videos_and_channels(
+            youtube, cache, carry, [], store, trace
+        )
+        video_items.extend(v_items)
+        errors.update({f"{k}#{page}": e for k, e in fetch_errors.items()})
+        quota_used += list_calls * QUOTA_COST["videos"]
+        if on_partial is not None:
+            on_partial(video_items, channel_items)
+
+    return video_items, channel_items, errors, quota_used
+
+
+def collect_trending(youtube, cache, regions, categories, max_pages=1, store=None,
+                     trace=None):
+    """트렌딩 차트 수집: 지역×카테고리마다 videos().list(chart="mostPopular")를 병렬 호출.
+
+    차트 응답에 통계/스니펫/길이가 모두 있어 search·videos 조회가 필요 없고
+    (페이지당 1 유닛), 채널 구독자 수만 마지막에 50개 단위로 한 번씩 조회한다.
+    페이지가 끝나는 대로 nextPageToken으로 다음 페이지를 바로 요청한다 (max_pages까지).
+    차트가 없는 지역/카테고리 조합은 API가 에러를 돌려주는데, 이는 건너뛰고
+    (errors에 넣지 않음) 나머지 실패만 errors에 남긴다.
+
+    반환: (video_items, channel_items, errors, quota_used)
+    """
+    pool = _executor()
+    method = youtube.videos().list
+    pending, errors = {}, {}
+    quota_used = 0
+
+    def submit(region_code, category, page, token=None):
+        nonlocal quota_used
+        params = {"part": _PARTS["videos"], "chart": "mostPopular",
+                  "maxResults": CHUNK_SIZE, "fields": FIELDS["chart"]}
+        if region_code:
+            params["regionCode"] = region_code
+        if category:
+            params["videoCategoryId"] = category
+        if token:
+            params["pageToken"] = token
+        label = f"chart[{_region_label(region_code)}/{category or '전체'}#{page}]"
+        fn = _call(cache, "chart", method, params, label, trace)
+        pending[pool.submit(fn)] = (label, region_code, category, page)
+        quota_used += QUOTA_COST["chart"]
+
+    for region_code in regions:
+        for category in categories:
+            submit(region_code, category, 0)
+
+    videos = {}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            label, region_code, category, page = pending.pop(fut)
+            try:
+                res = fut.result()
+            except HttpError as e:
+                if error_reason(e) not in _CHART_UNAVAILABLE:
+                    errors[label] = str(e)
+                continue
+            except Exception as e:
+                errors[label] = str(e)
+                continue
+            for item in res.get("items", []):
+                videos.setdefault(item["id"], item)
+            if res.get("nextPageToken") and page + 1 < max_pages:
+                submit(region_code, category, page + 1, res["nextPageToken"])
+
+    video_items = list(videos.values())
+    if store is not None:
+        store.put("videos", video_items)
+    channel_ids = list(dict.fromkeys(v["snippet"]["channelId"] for v in video_items))
+    _, channel_items, fetch_errors, list_calls = fetch_videos_and_channels(
+        youtube, cache, [], channel_ids, store, trace
+    )
+    errors.update(fetch_errors)
+    quota_used += list_calls * QUOTA_COST["channels"]
+    return video_items, channel_items, errors, quota_used